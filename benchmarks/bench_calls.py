@@ -0,0 +1,32 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_engines import bench
+from src.interpreter import Interpreter, activations
+
+CALLS = 20000
+
+PROGRAM = f"""
+FUNC add(a, b): a + b
+FOR i = 0 TO {CALLS} THEN add(i, 1)
+"""
+
+# The same loop with the body inlined, to separate call overhead from work.
+BASELINE = f"""
+FOR i = 0 TO {CALLS} THEN i + 1
+"""
+
+if __name__ == '__main__':
+    baseline = bench(BASELINE, 'tree')
+    Interpreter.inline_calls = False
+    before = bench(PROGRAM, 'tree')
+    Interpreter.inline_calls = True
+    after = bench(PROGRAM, 'tree')
+
+    print(f'generic calls     {CALLS / before:,.0f} calls/s, '
+          f'{(before - baseline) / CALLS * 1e6:.2f} us overhead per call')
+    print(f'inline-cached     {CALLS / after:,.0f} calls/s, '
+          f'{(after - baseline) / CALLS * 1e6:.2f} us overhead per call ({(before - baseline) / (after - baseline):.2f}x)')
+    print(f'activation pool   created {activations.created}, reused {activations.reused}')
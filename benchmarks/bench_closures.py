@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import interpreter
+from src.interpreter import Function, global_symbol_table
+
+# Every call leaves one closure behind in a global list. The closure only
+# reads n, but the frame it was made in also holds a scratch list.
+PROGRAM = """
+VAR closures = []
+FUNC make(n)
+    VAR scratch = FOR k = 0 TO 10 THEN k * n
+    APPEND(closures, FUNC (x): x + n)
+END
+FOR i = 0 TO {closures} THEN make(i)
+(closures.[{closures} - 1])(1)
+"""
+
+# Bytes a stored closure may keep alive before this counts as a regression.
+MAX_BYTES_PER_CLOSURE = 2048
+
+
+def measure(closures):
+    symbols = dict(global_symbol_table.symbols)
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result, error = interpreter.run_program('<bench>', PROGRAM.format(closures=closures))
+        elapsed = time.perf_counter() - start
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        global_symbol_table.symbols = symbols
+    if error:
+        raise Exception(error.to_string())
+    if result.elements[-1].value != closures:
+        raise Exception(f'closure returned {result.elements[-1]}, expected {closures}')
+    return elapsed, retained
+
+
+if __name__ == '__main__':
+    closures = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    Function.capture_free_names = False
+    before = measure(closures)
+    Function.capture_free_names = True
+    after = measure(closures)
+
+    for name, (elapsed, retained) in (('whole frames', before), ('free names', after)):
+        print(f'{name:<14} {closures} closures  {elapsed:.2f}s  retained {retained / 1024 / 1024:,.1f} MiB  '
+              f'({retained / closures:,.0f} bytes per closure)')
+
+    if after[1] / closures > MAX_BYTES_PER_CLOSURE:
+        sys.exit(f'closures retain {after[1] / closures:,.0f} bytes each, over {MAX_BYTES_PER_CLOSURE}')
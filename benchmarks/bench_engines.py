@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.setrecursionlimit(100000)
+
+from src import interpreter
+
+FIB = """
+FUNC fib(n): IF n < 2 THEN n ELSE fib(n - 1) + fib(n - 2)
+fib(20)
+"""
+
+NESTED_FOR = """
+VAR total = 0
+FOR i = 0 TO 300 THEN
+    FOR j = 0 TO 300 THEN
+        VAR total = total + i * j
+    END
+END
+total
+"""
+
+DEEP_CALLS = """
+FUNC down(n): IF n == 0 THEN 0 ELSE IS_NUM(n) + down(n - 1)
+FOR i = 0 TO 20 THEN down(300)
+"""
+
+INVARIANT_LOOP = """
+VAR scale = 3
+VAR offset = 7
+VAR total = 0
+FOR i = 0 TO 30000 THEN
+    VAR total = total + i * (scale * scale + offset * 2 - scale / 3)
+END
+total
+"""
+
+
+def bench(text, engine, repeat=3, optimize=False):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result, error = interpreter.run_program('<bench>', text, engine=engine, optimize=optimize)
+        elapsed = time.perf_counter() - start
+        if error:
+            raise Exception(error.to_string())
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+ENGINES = ('tree', 'vm', 'closure', 'python', 'tiered', 'quicken', 'slots', 'unwind', 'unboxed', 'stack')
+
+if __name__ == '__main__':
+    workloads = (
+        ('recursive fib(20)', FIB),
+        ('nested FOR 300x300', NESTED_FOR),
+        ('deep calls 20x300', DEEP_CALLS)
+    )
+    for name, text in workloads:
+        tree = bench(text, 'tree')
+        line = f'{name:<20} tree {tree:.3f}s'
+        for engine in ENGINES[1:]:
+            elapsed = bench(text, engine)
+            line += f'  {engine} {elapsed:.3f}s ({tree / elapsed:.2f}x)'
+        print(line)
+
+    line = f'{"invariant loop":<20}'
+    for engine in ENGINES:
+        plain = bench(INVARIANT_LOOP, engine)
+        optimized = bench(INVARIANT_LOOP, engine, optimize=True)
+        line += f'  {engine} {plain:.3f}s -> {optimized:.3f}s ({plain / optimized:.2f}x)'
+    print(line)
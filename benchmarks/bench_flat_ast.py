@@ -0,0 +1,105 @@
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_lexer import source
+from src.flat import *
+from src.parser import Parser
+
+REPEAT = 5
+
+
+def parse(text):
+    tokens, error = RegexLex('<bench>', text).create_buffer()
+    if error:
+        raise Exception(error.to_string())
+    ast = Parser(tokens).parse()
+    if ast.error:
+        raise Exception(ast.error.to_string())
+    return ast.node
+
+
+def retained(build):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def timed(visit, tree):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        result = visit(tree)
+    return result, (time.perf_counter() - start) / REPEAT
+
+
+# The names read anywhere in the program, the way free_names finds them.
+def names_in_nodes(root):
+    return {node.var_name_token.value for node in walk(root) if isinstance(node, VarAccessNode)}
+
+
+def names_in_flat(ast):
+    kinds = ast.kinds
+    return {ast.value(index) for index in range(len(ast)) if kinds[index] == NODE_VAR_ACCESS}
+
+
+# The deepest nesting, going from each node to its children.
+def depth_of_nodes(root):
+    deepest = 0
+    pending = [(root, 1)]
+    while pending:
+        node, depth = pending.pop()
+        deepest = max(deepest, depth)
+        pending.extend((child, depth + 1) for child in iter_child_nodes(node))
+    return deepest
+
+
+def depth_of_flat(ast):
+    deepest = 0
+    pending = [(0, 1)]
+    while pending:
+        index, depth = pending.pop()
+        deepest = max(deepest, depth)
+        pending.extend((child, depth + 1) for child in ast.children(index))
+    return deepest
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1024 * 1024
+    text = source(size)
+
+    root, tree_bytes = retained(lambda: parse(text))
+    ast = flatten(root)
+    if dump_flat(ast) != dump_tree(root):
+        raise Exception('the FlatAST does not match the tree it was made from')
+    del root, ast
+
+    # Only what outlives the node tree counts for the FlatAST: its arrays
+    # and the token values.
+    def flat_only():
+        return flatten(parse(text))
+    ast, flat_bytes = retained(flat_only)
+    nodes = len(ast)
+
+    print(f'{nodes:,} nodes')
+    print(f'node objects  {tree_bytes / 1024 / 1024:6.1f} MiB  {tree_bytes / nodes:5.0f} bytes per node')
+    print(f'FlatAST       {flat_bytes / 1024 / 1024:6.1f} MiB  {flat_bytes / nodes:5.0f} bytes per node')
+
+    root = parse(text)
+    for task, visit_nodes, visit_flat in (('names read', names_in_nodes, names_in_flat),
+                                          ('deepest nesting', depth_of_nodes, depth_of_flat)):
+        expected, before = timed(visit_nodes, root)
+        result, after = timed(visit_flat, ast)
+        if result != expected:
+            raise Exception(f'{task}: FlatAST gave {result!r}, expected {expected!r}')
+        print(f'{task:<16} node objects {before:.3f}s  FlatAST {after:.3f}s  ({before / after:.1f}x)')
@@ -0,0 +1,39 @@
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import interpreter
+
+NESTED_FOR = """
+VAR total = 0
+FOR i = 0 TO {outer} THEN
+    FOR j = 0 TO {inner} THEN
+        VAR total = total + j
+    END
+END
+total
+"""
+
+
+def measure(iterations, optimize=False):
+    side = math.isqrt(iterations)
+    text = NESTED_FOR.format(outer=iterations // side, inner=side)
+    start = time.perf_counter()
+    result, error = interpreter.run_program('<bench>', text, optimize=optimize)
+    elapsed = time.perf_counter() - start
+    if error:
+        raise Exception(error.to_string())
+    return elapsed
+
+
+if __name__ == '__main__':
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    for exponent in range(4, largest + 1):
+        iterations = 10 ** exponent
+        plain = measure(iterations)
+        optimized = measure(iterations, optimize=True)
+        print(f'10^{exponent:<3} iterations  plain {iterations / plain:10,.0f}/s  '
+              f'optimized {iterations / optimized:10,.0f}/s')
@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.lexer import Lex, RegexLex
+
+# A little of every token class, repeated into a few MB of source.
+CHUNK = """
+FUNC fib_{n}(n): IF n < 2 THEN n ELSE fib_{n}(n - 1) + fib_{n}(n - 2)
+VAR total = 0; VAR name = "item\\t{n}"
+FOR i = 0 TO {n} STEP 2 THEN
+    VAR total = total + i * 3.25 ^ 2 / (i + 1)
+    IF total >= 100 AND NOT i == 5 OR total != 7 THEN APPEND(list, [i, name, total <= 9])
+END
+WHILE total > 0 THEN VAR total = total - list.[0]
+"""
+
+
+def source(size):
+    chunks = []
+    length = 0
+    n = 0
+    while length < size:
+        chunk = CHUNK.format(n=n)
+        chunks.append(chunk)
+        length += len(chunk)
+        n += 1
+    return ''.join(chunks)
+
+
+def measure(lexer_class, text):
+    start = time.perf_counter()
+    tokens, error = lexer_class('<bench>', text).create_tokens()
+    elapsed = time.perf_counter() - start
+    if error:
+        raise Exception(error.to_string())
+    return tokens, elapsed
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2 * 1024 * 1024
+    text = source(size)
+
+    tokens, before = measure(Lex, text)
+    regex_tokens, after = measure(RegexLex, text)
+    if [(token.type, token.value) for token in tokens] != [(token.type, token.value) for token in regex_tokens]:
+        raise Exception('RegexLex produced a different token stream')
+
+    print(f'{len(text) / 1024 / 1024:.1f} MB, {len(tokens):,} tokens')
+    print(f'Lex        {before:.2f}s  {len(tokens) / before:12,.0f} tokens/s')
+    print(f'RegexLex   {after:.2f}s  {len(tokens) / after:12,.0f} tokens/s  ({before / after:.1f}x)')
@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import interpreter
+
+# Single-line loops whose value nobody reads: one inside a block function
+# body, one as a statement of a block loop.
+IN_FUNCTION = """
+FUNC run()
+    FOR i = 0 TO {iterations} THEN i * 2
+END
+run()
+"""
+
+IN_BLOCK = """
+VAR n = 0
+WHILE n < 1 THEN
+    VAR n = n + 1
+    FOR i = 0 TO {iterations} THEN i * 2
+END
+"""
+
+
+def measure(text, iterations):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result, error = interpreter.run_program('<bench>', text.format(iterations=iterations))
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    if error:
+        raise Exception(error.to_string())
+    return elapsed, peak
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    for name, text in (('loop in function', IN_FUNCTION), ('loop in block', IN_BLOCK)):
+        elapsed, peak = measure(text, iterations)
+        print(f'{name:<18} {iterations} iterations  {elapsed:.2f}s  peak {peak / 1024:,.1f} KiB')
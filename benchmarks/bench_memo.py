@@ -0,0 +1,37 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import interpreter
+
+FIB = """
+FUNC fib(n): IF n < 2 THEN n ELSE fib(n - 1) + fib(n - 2)
+{wrap}
+fib(20)
+"""
+
+# Monotone lattice paths through a grid, a two-argument DP.
+PATHS = """
+FUNC paths(r, c): IF r == 0 OR c == 0 THEN 1 ELSE paths(r - 1, c) + paths(r, c - 1)
+{wrap}
+paths(9, 9)
+"""
+
+
+def measure(text, wrap):
+    start = time.perf_counter()
+    result, error = interpreter.run_program('<bench>', text.format(wrap=wrap))
+    elapsed = time.perf_counter() - start
+    if error:
+        raise Exception(error.to_string())
+    return elapsed, result.elements[-1]
+
+
+if __name__ == '__main__':
+    for name, text, func in (('fib(20)', FIB, 'fib'), ('paths(9, 9)', PATHS, 'paths')):
+        plain, expected = measure(text, '')
+        memoized, result = measure(text, f'VAR {func} = MEMO({func}, 0)')
+        assert repr(result) == repr(expected)
+        print(f'{name:<12} plain {plain:.3f}s  MEMO {memoized:.4f}s ({plain / memoized:.0f}x)')
@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.lexer import RegexLex
+from src.parser import Parser
+
+STATEMENT = 'VAR total = (total + 1) * 2; PRINT("step"); IF total > 10 THEN VAR total = 0\n'
+
+
+def materialized(text):
+    tokens, error = RegexLex('<bench>', text).create_tokens()
+    if error:
+        raise Exception(error.to_string())
+    return Parser(tokens).parse()
+
+
+def streamed(text):
+    return Parser(RegexLex('<bench>', text).generate_tokens()).parse()
+
+
+def buffered(text):
+    tokens, error = RegexLex('<bench>', text).create_buffer()
+    if error:
+        raise Exception(error.to_string())
+    return Parser(tokens).parse()
+
+
+def measure(parse, text):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        ast = parse(text)
+        elapsed = time.perf_counter() - start
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    if ast.error:
+        raise Exception(ast.error.to_string())
+    return elapsed, retained, peak
+
+
+if __name__ == '__main__':
+    for statements in (1000, 5000, 20000):
+        text = STATEMENT * statements
+        for name, parse in (('token list', materialized), ('token stream', streamed),
+                           ('token buffer', buffered)):
+            elapsed, retained, peak = measure(parse, text)
+            print(f'{statements:>6} statements  {name:<13} {elapsed:.2f}s  '
+                  f'peak {peak / 1024 / 1024:7.1f} MiB  AST {retained / 1024 / 1024:7.1f} MiB')
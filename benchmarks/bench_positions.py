@@ -0,0 +1,35 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_lexer import source
+from src.lexer import RegexLex
+
+
+def measure(text):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        tokens, error = RegexLex('<bench>', text).create_tokens()
+        elapsed = time.perf_counter() - start
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    if error:
+        raise Exception(error.to_string())
+    return tokens, elapsed, retained
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1024 * 1024
+    text = source(size)
+    tokens, elapsed, retained = measure(text)
+    positions = {id(token.pos_beg) for token in tokens} | {id(token.pos_end) for token in tokens}
+
+    print(f'{len(text) / 1024 / 1024:.1f} MB, {len(tokens):,} tokens, {len(positions):,} positions')
+    print(f'lexing with tracing {elapsed:.2f}s, retained {retained / 1024 / 1024:.1f} MiB '
+          f'({retained / len(tokens):.0f} bytes per token)')
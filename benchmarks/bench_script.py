@@ -0,0 +1,31 @@
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import interpreter
+
+# A batch script whose statements each produce a sizeable value.
+STATEMENT = "FOR i = 0 TO 200 THEN i * 2\n"
+
+
+def measure(statements, script):
+    text = STATEMENT * statements
+    tracemalloc.start()
+    try:
+        result, error = interpreter.run_program('<bench>', text, script=script)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    if error:
+        raise Exception(error.to_string())
+    return peak
+
+
+if __name__ == '__main__':
+    for statements in (100, 1000, 5000):
+        kept = measure(statements, script=False)
+        script = measure(statements, script=True)
+        print(f'{statements:>5} statements  all results {kept / 1024:10,.0f} KiB  '
+              f'script mode {script / 1024:8,.0f} KiB')
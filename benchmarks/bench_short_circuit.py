@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_engines import bench, ENGINES
+
+EXPENSIVE = """
+FUNC expensive(v)
+    VAR total = 0
+    FOR k = 0 TO 50 THEN VAR total = total + k
+    total > v
+END
+"""
+
+GUARDED = EXPENSIVE + """
+FOR i = 0 TO 3000 THEN
+    IS_LIST(i) AND expensive(i)
+    IS_NUM(i) OR expensive(i)
+END
+"""
+
+EAGER = EXPENSIVE + """
+FOR i = 0 TO 3000 THEN
+    VAR guard = IS_LIST(i)
+    VAR check = expensive(i)
+    guard AND check
+    VAR guard = IS_NUM(i)
+    VAR check = expensive(i)
+    guard OR check
+END
+"""
+
+if __name__ == '__main__':
+    for engine in ENGINES:
+        eager = bench(EAGER, engine)
+        guarded = bench(GUARDED, engine)
+        print(f'{engine:<8} eager {eager:.3f}s  short-circuit {guarded:.3f}s ({eager / guarded:.2f}x)')
@@ -0,0 +1,56 @@
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_lexer import source
+from src.interpreter import Number
+from src.lexer import RegexLex
+from src.nodes import walk
+from src.parser import Parser
+
+
+def retained(build):
+    tracemalloc.start()
+    try:
+        result = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def lex(text):
+    tokens, error = RegexLex('<bench>', text).create_tokens()
+    if error:
+        raise Exception(error.to_string())
+    return tokens
+
+
+def parse(text):
+    ast = Parser(RegexLex('<bench>', text).generate_tokens()).parse()
+    if ast.error:
+        raise Exception(ast.error.to_string())
+    return ast.node
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1024 * 1024
+    numbers = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+    text = source(size)
+
+    tokens, token_bytes = retained(lambda: lex(text))
+    print(f'{len(tokens):>10,} tokens   {token_bytes / len(tokens):6.0f} bytes per token')
+    del tokens
+
+    # The AST holds the tokens of its leaves, so its bytes are per node
+    # including those.
+    ast, ast_bytes = retained(lambda: parse(text))
+    nodes = sum(1 for _ in walk(ast))
+    print(f'{nodes:>10,} nodes    {ast_bytes / nodes:6.0f} bytes per AST node')
+    del ast
+
+    values, number_bytes = retained(lambda: [Number(i) for i in range(numbers)])
+    print(f'{numbers:>10,} Numbers  {number_bytes / numbers:6.0f} bytes per Number')
@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import interpreter
+
+FIB = """
+FUNC fib(n): IF n < 2 THEN n ELSE fib(n - 1) + fib(n - 2)
+fib(18)
+"""
+
+NESTED_FOR = """
+VAR total = 0
+FOR i = 0 TO 200 THEN
+    FOR j = 0 TO 200 THEN
+        VAR total = total + i * j
+    END
+END
+total
+"""
+
+DEEP_RECURSION = """
+FUNC down(n): IF n == 0 THEN 0 ELSE 1 + down(n - 1)
+down({depth})
+"""
+
+MEMO_RECURSION = """
+VAR down = MEMO(FUNC (n): IF n == 0 THEN 0 ELSE 1 + down(n - 1), 0)
+down({depth})
+"""
+
+LONG_CHAIN = "1" + " + 1" * 5000
+
+NESTED_PARENS = "(1 + " * 5000 + "1" + ")" * 5000
+
+
+def measure(text, engine, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            result, error = interpreter.run_program('<bench>', text, engine=engine)
+        except RecursionError:
+            return 'RecursionError'
+        elapsed = time.perf_counter() - start
+        if error:
+            if error.details == 'Expression is nested too deeply':
+                return 'nested too deeply'
+            raise Exception(error.to_string())
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def describe(elapsed):
+    return elapsed if isinstance(elapsed, str) else f'{elapsed:.3f}s'
+
+
+if __name__ == '__main__':
+    workloads = (
+        ('recursive fib(18)', FIB),
+        ('nested FOR 200x200', NESTED_FOR),
+        ('recursion depth 100', DEEP_RECURSION.format(depth=100)),
+        ('recursion depth 5000', DEEP_RECURSION.format(depth=5000)),
+        ('MEMO depth 5000', MEMO_RECURSION.format(depth=5000)),
+        ('5000-term sum', LONG_CHAIN),
+        ('5000 nested (1 + ...)', NESTED_PARENS)
+    )
+    for name, text in workloads:
+        tree = measure(text, 'tree')
+        stack = measure(text, 'stack')
+        line = f'{name:<22} tree {describe(tree):<18} stack {describe(stack)}'
+        if not isinstance(tree, str):
+            line += f' ({stack / tree:.2f}x the time)'
+        print(line)
@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import interpreter
+from src.interpreter import Interpreter
+
+COUNTDOWN = """
+FUNC count(n, total): IF n == 0 THEN total ELSE count(n - 1, total + n)
+count({depth}, 0)
+"""
+
+EVEN_ODD = """
+FUNC even(n): IF n == 0 THEN 1 ELSE odd(n - 1)
+FUNC odd(n): IF n == 0 THEN 0 ELSE even(n - 1)
+even({depth})
+"""
+
+
+def measure(text, depth):
+    start = time.perf_counter()
+    try:
+        result, error = interpreter.run_program('<bench>', text.format(depth=depth))
+    except RecursionError:
+        return 'RecursionError'
+    if error:
+        raise Exception(error.to_string())
+    return f'{time.perf_counter() - start:.3f}s'
+
+
+if __name__ == '__main__':
+    for name, text in (('self', COUNTDOWN), ('mutual', EVEN_ODD)):
+        for depth in (100, 1000, 100000):
+            Interpreter.eliminate_tail_calls = False
+            before = measure(text, depth)
+            Interpreter.eliminate_tail_calls = True
+            after = measure(text, depth)
+            print(f'{name:<7} depth {depth:<7} plain {before:<15} tail calls {after}')
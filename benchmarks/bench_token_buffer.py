@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_lexer import source
+from src.lexer import RegexLex
+from src.parser import Parser
+
+
+def token_list(text):
+    return RegexLex('<bench>', text).create_tokens()
+
+
+def token_buffer(text):
+    return RegexLex('<bench>', text).create_buffer()
+
+
+def measure(lex, text):
+    start = time.perf_counter()
+    tokens, error = lex(text)
+    lexed = time.perf_counter() - start
+    if error:
+        raise Exception(error.to_string())
+
+    tracemalloc.start()
+    try:
+        tokens, _ = lex(text)
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    start = time.perf_counter()
+    ast = Parser(tokens).parse()
+    parsed = time.perf_counter() - start
+    if ast.error:
+        raise Exception(ast.error.to_string())
+    return len(tokens), lexed, retained, parsed
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 3 * 1024 * 1024
+    text = source(size)
+
+    for name, lex in (('Token list', token_list), ('TokenBuffer', token_buffer)):
+        tokens, lexed, retained, parsed = measure(lex, text)
+        print(f'{name:<12} {tokens:,} tokens  lex {lexed:.2f}s  {retained / 1024 / 1024:6.1f} MiB '
+              f'({retained / tokens:5.1f} bytes per token)  parse {parsed:.2f}s')
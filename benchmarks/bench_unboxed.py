@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import interpreter
+from src.interpreter import Number
+
+LOOP = """
+VAR total = 0
+FOR i = 0 TO {iterations} THEN
+    VAR total = total + i * 2 - 1
+END
+total
+"""
+
+
+def measure(engine, iterations):
+    counted = [0]
+    number_init = Number.__init__
+
+    def counting_init(self, value):
+        counted[0] += 1
+        number_init(self, value)
+
+    Number.__init__ = counting_init
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result, error = interpreter.run_program('<bench>', LOOP.format(iterations=iterations), engine=engine)
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        Number.__init__ = number_init
+
+    if error:
+        raise Exception(error.to_string())
+    return elapsed, peak, counted[0]
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    for engine in ('tree', 'unwind', 'unboxed'):
+        elapsed, peak, numbers = measure(engine, iterations)
+        print(f'{engine:<8} {elapsed:.2f}s  peak {peak / 1024:.1f} KiB  '
+              f'{numbers} Numbers ({numbers / iterations:.2f} per iteration)')
@@ -1,5 +1,20 @@
+import sys
+
 from src import interpreter
 
+# A file argument runs it as a script: statement results are not kept, and
+# only errors are printed.
+if len(sys.argv) > 1:
+    path = sys.argv[1]
+    with open(path) as file:
+        text = file.read()
+
+    result, error = interpreter.run_program(path, text, script=True)
+    if error:
+        print(error.to_string())
+        sys.exit(1)
+    sys.exit(0)
+
 while True:
     text = input('cap > ')
     if text.strip() == "":
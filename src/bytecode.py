@@ -0,0 +1,242 @@
+from .nodes import *
+from .lexer import *
+
+
+# ----------------- OPCODES --------------------
+
+OP_LOAD_CONST = 0
+OP_LOAD_NAME = 1
+OP_STORE_NAME = 2
+OP_BINARY_OP = 3
+OP_UNARY_OP = 4
+OP_POP_TOP = 5
+OP_JUMP = 6
+OP_POP_JUMP_IF_FALSE = 7
+OP_LOAD_NULL = 8
+OP_BUILD_LIST = 9
+OP_MAKE_FUNCTION = 10
+OP_CALL = 11
+OP_NEW_ACC = 12
+OP_ACC_APPEND = 13
+OP_END_ACC = 14
+OP_FOR_PREP = 15
+OP_FOR_ITER = 16
+OP_END_FOR = 17
+OP_LOAD_VALUE = 18
+OP_LOAD_INVARIANT = 19
+OP_STORE_INVARIANT = 20
+OP_SHORT_CIRCUIT = 21
+
+OPCODE_NAMES = {
+    value: name[3:] for name, value in list(globals().items()) if name.startswith('OP_')
+}
+
+BINARY_OPERATORS = {
+    TOK_PLUS: 'add',
+    TOK_MINUS: 'subtract',
+    TOK_MULT: 'multiply',
+    TOK_DIV: 'divide',
+    TOK_POW: 'exponentiate',
+    TOK_ISEQ: 'equals',
+    TOK_NEQ: 'not_equals',
+    TOK_LT: 'less_than',
+    TOK_GT: 'greater_than',
+    TOK_LEQ: 'less_than_or_equal',
+    TOK_GEQ: 'greater_than_or_equal',
+    'AND': 'logical_and',
+    'OR': 'logical_or',
+    TOK_DOT: 'indexed'
+}
+
+
+def operator_method_name(operator_token):
+    if operator_token.type == TOK_KEYWORD:
+        return BINARY_OPERATORS[operator_token.value]
+    return BINARY_OPERATORS[operator_token.type]
+
+
+# --------------- CODE OBJECT ------------------
+
+class CodeObject:
+    def __init__(self, name):
+        self.name = name
+        self.instructions = []
+        self.consts = []
+        self.const_indices = {}
+
+    def emit(self, op, arg=None, node=None):
+        self.instructions.append((op, arg, node))
+        return len(self.instructions) - 1
+
+    def patch(self, index, target):
+        op, _, node = self.instructions[index]
+        self.instructions[index] = (op, target, node)
+
+    def add_const(self, value):
+        key = (type(value), value)
+        if key not in self.const_indices:
+            self.const_indices[key] = len(self.consts)
+            self.consts.append(value)
+        return self.const_indices[key]
+
+    def disassemble(self):
+        lines = []
+        for index, (op, arg, _) in enumerate(self.instructions):
+            if op == OP_LOAD_CONST:
+                arg = f'{arg} ({self.consts[arg]!r})'
+            elif op == OP_MAKE_FUNCTION:
+                arg = f'<code {arg.name}>'
+            lines.append(f'{index:>4} {OPCODE_NAMES[op]:<16} {"" if arg is None else arg}')
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return f'<code {self.name}>'
+
+
+# ---------------- COMPILER --------------------
+
+class Compiler:
+    def compile(self, node, name='<program>'):
+        code = CodeObject(name)
+        self.compile_node(node, code)
+        return code
+
+    def compile_node(self, node, code):
+        method_name = f'compile_{type(node).__name__}'
+        method = getattr(self, method_name, self.no_compile_method)
+        method(node, code)
+
+    def no_compile_method(self, node, code):
+        raise Exception(f'No compile_{type(node).__name__} method defined')
+
+    @staticmethod
+    def compile_NumberNode(node, code):
+        code.emit(OP_LOAD_CONST, code.add_const(node.tok.value), node)
+
+    @staticmethod
+    def compile_StringNode(node, code):
+        code.emit(OP_LOAD_CONST, code.add_const(node.tok.value), node)
+
+    @staticmethod
+    def compile_ConstNode(node, code):
+        code.emit(OP_LOAD_VALUE, node.value, node)
+
+    def compile_InvariantNode(self, node, code):
+        cached = code.emit(OP_LOAD_INVARIANT, None, node)
+        self.compile_node(node.node, code)
+        code.emit(OP_STORE_INVARIANT, None, node)
+        code.patch(cached, len(code.instructions))
+
+    @staticmethod
+    def compile_VarAccessNode(node, code):
+        code.emit(OP_LOAD_NAME, node.var_name_token.value, node)
+
+    def compile_VarAssignNode(self, node, code):
+        self.compile_node(node.value_node, code)
+        code.emit(OP_STORE_NAME, node.var_name_token.value, node)
+
+    def compile_BinOpNode(self, node, code):
+        self.compile_node(node.left_node, code)
+        short_circuit = code.emit(OP_SHORT_CIRCUIT, None, node) if node.operator_token.type == TOK_KEYWORD else None
+        self.compile_node(node.right_node, code)
+        code.emit(OP_BINARY_OP, operator_method_name(node.operator_token), node)
+        if short_circuit is not None:
+            code.patch(short_circuit, len(code.instructions))
+
+    def compile_UnaryOpNode(self, node, code):
+        self.compile_node(node.node, code)
+        if node.operator_token.type == TOK_MINUS:
+            code.emit(OP_UNARY_OP, 'negate', node)
+        elif node.operator_token.is_match(TOK_KEYWORD, 'NOT'):
+            code.emit(OP_UNARY_OP, 'logical_not', node)
+        else:
+            code.emit(OP_UNARY_OP, None, node)
+
+    def compile_IfNode(self, node, code):
+        end_jumps = []
+
+        for condition, expr, null_check in node.cases:
+            self.compile_node(condition, code)
+            next_case = code.emit(OP_POP_JUMP_IF_FALSE, None, condition)
+            self.compile_branch(expr, null_check, code)
+            end_jumps.append(code.emit(OP_JUMP))
+            code.patch(next_case, len(code.instructions))
+
+        if node.else_case:
+            expr, null_check = node.else_case
+            self.compile_branch(expr, null_check, code)
+        else:
+            code.emit(OP_LOAD_NULL)
+
+        for index in end_jumps:
+            code.patch(index, len(code.instructions))
+
+    def compile_branch(self, expr, null_check, code):
+        self.compile_node(expr, code)
+        if null_check:
+            code.emit(OP_POP_TOP)
+            code.emit(OP_LOAD_NULL)
+
+    # A loop whose value is thrown away gets no list to collect into.
+    @staticmethod
+    def discards_values(node):
+        return node.null_check or not node.value_used
+
+    def compile_WhileNode(self, node, code):
+        code.emit(OP_NEW_ACC, self.discards_values(node), node)
+        loop_start = len(code.instructions)
+
+        self.compile_node(node.condition_node, code)
+        exit_jump = code.emit(OP_POP_JUMP_IF_FALSE, None, node.condition_node)
+
+        self.compile_node(node.body_node, code)
+        code.emit(OP_ACC_APPEND, 1)
+        code.emit(OP_JUMP, loop_start)
+
+        code.patch(exit_jump, len(code.instructions))
+        code.emit(OP_END_ACC, self.discards_values(node), node)
+
+    def compile_ForNode(self, node, code):
+        code.emit(OP_NEW_ACC, self.discards_values(node), node)
+
+        self.compile_node(node.start_value_node, code)
+        self.compile_node(node.end_value_node, code)
+        if node.step_value_node:
+            self.compile_node(node.step_value_node, code)
+        else:
+            code.emit(OP_LOAD_NULL)
+        code.emit(OP_FOR_PREP, node.step_value_node is not None, node)
+
+        loop_start = code.emit(OP_FOR_ITER, None, node)
+        self.compile_node(node.body_node, code)
+        code.emit(OP_ACC_APPEND, 2)
+        code.emit(OP_JUMP, loop_start)
+
+        code.patch(loop_start, (len(code.instructions), node.var_name_token.value))
+        code.emit(OP_END_FOR)
+        code.emit(OP_END_ACC, self.discards_values(node), node)
+
+    def compile_FuncDefNode(self, node, code):
+        func_name = node.var_name_token.value if node.var_name_token else None
+        body_code = self.compile(node.body_node, func_name or '<anonymous>')
+        code.emit(OP_MAKE_FUNCTION, body_code, node)
+
+    def compile_CallNode(self, node, code):
+        self.compile_node(node.node_to_call, code)
+        for arg_node in node.arg_nodes:
+            self.compile_node(arg_node, code)
+        code.emit(OP_CALL, len(node.arg_nodes), node)
+
+    def compile_ListNode(self, node, code):
+        if not node.value_used:
+            for index, element_node in enumerate(node.element_nodes):
+                if index:
+                    code.emit(OP_POP_TOP)
+                self.compile_node(element_node, code)
+            if not node.element_nodes:
+                code.emit(OP_LOAD_NULL)
+            return
+
+        for element_node in node.element_nodes:
+            self.compile_node(element_node, code)
+        code.emit(OP_BUILD_LIST, len(node.element_nodes), node)
@@ -0,0 +1,353 @@
+from .interpreter import *
+from .bytecode import operator_method_name
+
+
+# ------------ CLOSURE FUNCTION -------------
+
+class ClosureFunction(Function):
+    __slots__ = ('body',)
+
+    def __init__(self, name, body_node, arg_names, null_check, body):
+        super().__init__(name, body_node, arg_names, null_check)
+        self.body = body
+
+    def execute(self, args):
+        res = RTResult()
+        exec_ctx = self.generate_new_context()
+
+        res.register(self.check_and_populate_args(self.arg_names, args, exec_ctx))
+        if res.error:
+            return res
+
+        value, error = self.body(exec_ctx)
+        if error:
+            return res.failure(error)
+        return res.success(Number.null if self.null_check else value)
+
+    def copy(self):
+        copy = ClosureFunction(self.name, self.body_node, self.arg_names, self.null_check, self.body)
+        copy.context = self.context
+        copy.body_names = self.body_names
+        copy.set_pos(self.pos_beg, self.pos_end)
+        return copy
+
+
+# ------------ CLOSURE COMPILER -------------
+
+class ClosureCompiler:
+    def compile(self, node):
+        method_name = f'compile_{type(node).__name__}'
+        method = getattr(self, method_name, self.no_compile_method)
+        return method(node)
+
+    def no_compile_method(self, node):
+        raise Exception(f'No compile_{type(node).__name__} method defined')
+
+    def compile_program(self, node):
+        program = self.compile(node)
+
+        def run(context):
+            value, error = program(context)
+            return RTResult().failure(error) if error else RTResult().success(value)
+
+        return run
+
+    @staticmethod
+    def compile_NumberNode(node):
+        value, pos_beg, pos_end = node.tok.value, node.pos_beg, node.pos_end
+
+        def number(context):
+            return Number(value).set_context(context).set_pos(pos_beg, pos_end), None
+
+        return number
+
+    @staticmethod
+    def compile_StringNode(node):
+        value, pos_beg, pos_end = node.tok.value, node.pos_beg, node.pos_end
+
+        def string(context):
+            return String(value).set_context(context).set_pos(pos_beg, pos_end), None
+
+        return string
+
+    @staticmethod
+    def compile_ConstNode(node):
+        value = node.value
+
+        def const(context):
+            return value.set_context(context), None
+
+        return const
+
+    def compile_InvariantNode(self, node):
+        expr = self.compile(node.node)
+
+        def invariant(context):
+            value = node.cached(context)
+            if value is not None:
+                return value, None
+
+            value, error = expr(context)
+            if not error and isinstance(value, (Number, String)):
+                node.remember(context, value)
+            return value, error
+
+        return invariant
+
+    @staticmethod
+    def compile_VarAccessNode(node):
+        var_name, pos_beg, pos_end = node.var_name_token.value, node.pos_beg, node.pos_end
+
+        def var_access(context):
+            value = context.symbol_table.get(var_name)
+            if not value:
+                return None, RTError(pos_beg, pos_end, f"'{var_name}' is not defined", context)
+            return value.copy().set_pos(pos_beg, pos_end).set_context(context), None
+
+        return var_access
+
+    def compile_VarAssignNode(self, node):
+        var_name = node.var_name_token.value
+        value_node = self.compile(node.value_node)
+
+        def var_assign(context):
+            value, error = value_node(context)
+            if error:
+                return None, error
+            context.symbol_table.set(var_name, value)
+            return value, None
+
+        return var_assign
+
+    def compile_BinOpNode(self, node):
+        left_node = self.compile(node.left_node)
+        right_node = self.compile(node.right_node)
+        method_name = operator_method_name(node.operator_token)
+        pos_beg, pos_end = node.pos_beg, node.pos_end
+        logical = node.operator_token.type == TOK_KEYWORD
+        methods = {}
+
+        def bin_op(context):
+            left, error = left_node(context)
+            if error:
+                return None, error
+
+            if logical:
+                result = short_circuit(node, left)
+                if result is not None:
+                    return result, None
+
+            right, error = right_node(context)
+            if error:
+                return None, error
+
+            cls = type(left)
+            method = methods.get(cls)
+            if method is None:
+                method = methods[cls] = getattr(cls, method_name)
+
+            result, error = method(left, right)
+            if error:
+                return None, error
+            return result.set_pos(pos_beg, pos_end), None
+
+        return bin_op
+
+    def compile_UnaryOpNode(self, node):
+        operand = self.compile(node.node)
+        pos_beg, pos_end = node.pos_beg, node.pos_end
+
+        if node.operator_token.type == TOK_MINUS:
+            def apply(number):
+                return number.multiply(Number(-1))
+        elif node.operator_token.is_match(TOK_KEYWORD, 'NOT'):
+            def apply(number):
+                return number.logical_not()
+        else:
+            def apply(number):
+                return number, None
+
+        def unary_op(context):
+            number, error = operand(context)
+            if error:
+                return None, error
+            number, error = apply(number)
+            if error:
+                return None, error
+            return number.set_pos(pos_beg, pos_end), None
+
+        return unary_op
+
+    def compile_IfNode(self, node):
+        cases = [(self.compile(condition), self.compile(expr), null_check)
+                 for condition, expr, null_check in node.cases]
+        if node.else_case:
+            else_expr, else_null_check = self.compile(node.else_case[0]), node.else_case[1]
+        else:
+            else_expr, else_null_check = None, False
+
+        def if_expr(context):
+            for condition, expr, null_check in cases:
+                condition_value, error = condition(context)
+                if error:
+                    return None, error
+
+                if condition_value.is_true():
+                    expr_value, error = expr(context)
+                    if error:
+                        return None, error
+                    return Number.null if null_check else expr_value, None
+
+            if else_expr:
+                expr_value, error = else_expr(context)
+                if error:
+                    return None, error
+                return Number.null if else_null_check else expr_value, None
+
+            return Number.null, None
+
+        return if_expr
+
+    def compile_WhileNode(self, node):
+        condition_node = self.compile(node.condition_node)
+        body_node = self.compile(node.body_node)
+        collect, pos_beg, pos_end = node.value_used and not node.null_check, node.pos_beg, node.pos_end
+
+        def while_expr(context):
+            elements = [] if collect else None
+            node.generation += 1
+
+            while True:
+                condition, error = condition_node(context)
+                if error:
+                    return None, error
+
+                if not condition.is_true():
+                    break
+
+                value, error = body_node(context)
+                if error:
+                    return None, error
+                if elements is not None:
+                    elements.append(value)
+
+            if elements is None:
+                return Number.null, None
+            return List(elements).set_context(context).set_pos(pos_beg, pos_end), None
+
+        return while_expr
+
+    def compile_ForNode(self, node):
+        var_name = node.var_name_token.value
+        start_value_node = self.compile(node.start_value_node)
+        end_value_node = self.compile(node.end_value_node)
+        step_value_node = self.compile(node.step_value_node) if node.step_value_node else None
+        body_node = self.compile(node.body_node)
+        collect, pos_beg, pos_end = node.value_used and not node.null_check, node.pos_beg, node.pos_end
+
+        def for_expr(context):
+            elements = [] if collect else None
+            node.generation += 1
+
+            start_value, error = start_value_node(context)
+            if error:
+                return None, error
+
+            end_value, error = end_value_node(context)
+            if error:
+                return None, error
+
+            if step_value_node:
+                step_value, error = step_value_node(context)
+                if error:
+                    return None, error
+            else:
+                step_value = Number(1)
+
+            i = start_value.value
+            step = step_value.value
+            ascending = step >= 0
+            symbol_table = context.symbol_table
+
+            while i < end_value.value if ascending else i > end_value.value:
+                symbol_table.set(var_name, Number(i))
+                i += step
+
+                value, error = body_node(context)
+                if error:
+                    return None, error
+                if elements is not None:
+                    elements.append(value)
+
+            if elements is None:
+                return Number.null, None
+            return List(elements).set_context(context).set_pos(pos_beg, pos_end), None
+
+        return for_expr
+
+    def compile_FuncDefNode(self, node):
+        func_name = node.var_name_token.value if node.var_name_token else None
+        body_node = node.body_node
+        body = self.compile(body_node)
+        arg_names = [arg_name.value for arg_name in node.arg_name_tokens]
+        null_check, pos_beg, pos_end = node.null_check, node.pos_beg, node.pos_end
+
+        def func_def(context):
+            func_value = ClosureFunction(func_name, body_node, arg_names, null_check, body) \
+                .set_context(context).set_pos(pos_beg, pos_end)
+            if func_name:
+                context.symbol_table.set(func_name, func_value)
+            return func_value, None
+
+        return func_def
+
+    def compile_CallNode(self, node):
+        node_to_call = self.compile(node.node_to_call)
+        arg_nodes = [self.compile(arg_node) for arg_node in node.arg_nodes]
+        pos_beg, pos_end = node.pos_beg, node.pos_end
+
+        def call(context):
+            value_to_call, error = node_to_call(context)
+            if error:
+                return None, error
+            value_to_call = value_to_call.copy().set_pos(pos_beg, pos_end)
+
+            args = []
+            for arg_node in arg_nodes:
+                value, error = arg_node(context)
+                if error:
+                    return None, error
+                args.append(value)
+
+            res = value_to_call.execute(args)
+            if res.error:
+                return None, res.error
+            return res.value.copy().set_pos(pos_beg, pos_end).set_context(context), None
+
+        return call
+
+    def compile_ListNode(self, node):
+        element_nodes = [self.compile(element_node) for element_node in node.element_nodes]
+        pos_beg, pos_end = node.pos_beg, node.pos_end
+
+        if not node.value_used:
+            def last_expr(context):
+                value = Number.null
+                for element_node in element_nodes:
+                    value, error = element_node(context)
+                    if error:
+                        return None, error
+                return value, None
+
+            return last_expr
+
+        def list_expr(context):
+            elements = []
+            for element_node in element_nodes:
+                value, error = element_node(context)
+                if error:
+                    return None, error
+                elements.append(value)
+            return List(elements).set_context(context).set_pos(pos_beg, pos_end), None
+
+        return list_expr
@@ -3,7 +3,7 @@ from .highlight_range import *
 # ----------------- ERROR -----------------------
 
 
-class Error:
+class Error(Exception):
     def __init__(self, pos_beg, pos_end, error_name, details):
         self.pos_beg = pos_beg
         self.pos_end = pos_end
@@ -48,6 +48,9 @@ class RTError(Error):
 
         while ctx:
             result = f'  File {pos.name}, line {str(pos.line + 1)}, in {ctx.display_name}\n' + result
+            if ctx.tail_calls:
+                plural = 's' if ctx.tail_calls > 1 else ''
+                result = f'  [{ctx.tail_calls} tail call{plural} elided]\n' + result
             pos = ctx.parent_entry_pos
             ctx = ctx.parent
 
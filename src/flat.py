@@ -0,0 +1,244 @@
+from array import array
+
+from .nodes import *
+from .lexer import *
+
+
+# ----------------- NODE KINDS --------------------
+
+NODE_NUMBER = 0
+NODE_STRING = 1
+NODE_VAR_ACCESS = 2
+NODE_VAR_ASSIGN = 3
+NODE_BIN_OP = 4
+NODE_UNARY_OP = 5
+NODE_IF = 6
+NODE_WHILE = 7
+NODE_FOR = 8
+NODE_FUNC_DEF = 9
+NODE_CALL = 10
+NODE_LIST = 11
+NODE_CONST = 12
+NODE_INVARIANT = 13
+
+NODE_KINDS = {
+    NumberNode: NODE_NUMBER,
+    StringNode: NODE_STRING,
+    VarAccessNode: NODE_VAR_ACCESS,
+    VarAssignNode: NODE_VAR_ASSIGN,
+    BinOpNode: NODE_BIN_OP,
+    UnaryOpNode: NODE_UNARY_OP,
+    IfNode: NODE_IF,
+    WhileNode: NODE_WHILE,
+    ForNode: NODE_FOR,
+    FuncDefNode: NODE_FUNC_DEF,
+    CallNode: NODE_CALL,
+    ListNode: NODE_LIST,
+    ConstNode: NODE_CONST,
+    InvariantNode: NODE_INVARIANT
+}
+
+NODE_NAMES = {kind: node_class.__name__ for node_class, kind in NODE_KINDS.items()}
+
+
+# ------------------- FLAGS -----------------------
+
+# null_check of a WhileNode, ForNode or FuncDefNode.
+FLAG_NULL_CHECK = 1
+# A case of an IfNode, or its else case, whose null_check is set.
+FLAG_NULL_CASE = 2
+# An IfNode with an else case, which is its last child.
+FLAG_ELSE = 4
+# A ForNode with a step, which is its third child.
+FLAG_STEP = 8
+# A FuncDefNode with a name, whose token comes before those of its arguments.
+FLAG_NAMED = 16
+FLAG_VALUE_USED = 32
+FLAG_TAIL_CALL = 64
+FLAG_TAIL_NULL_CHECK = 128
+# pos_end is a LineEndPosition.
+FLAG_LINE_END = 256
+
+
+# ------------------ FLAT AST ---------------------
+
+# A whole tree in parallel arrays with one entry per node, in preorder. The
+# children of a node follow it in the order of iter_child_nodes, and each
+# takes up sizes[child] entries, so visiting every node is a loop over
+# range(len(ast)). Tokens keep only their kind and value, and a node's
+# positions are offsets into the source.
+#
+# tokens holds the node's entry in the token table, or -1. For a
+# FuncDefNode it's the first of its name and argument tokens. data holds
+# the argument count of a FuncDefNode, the constant of a ConstNode and the
+# loop node of an InvariantNode.
+#
+# What the engines cache on nodes (slots, specializations, loop generations)
+# is left out, as it's only good for the run that filled it in.
+class FlatAST:
+    def __init__(self, source):
+        self.source = source
+        self.kinds = array('B')
+        self.flags = array('H')
+        self.sizes = array('I')
+        self.tokens = array('i')
+        self.data = array('i')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.token_kinds = array('B')
+        self.token_values = array('I')
+        self.constants = [None]
+        self.constant_indices = {}
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def add_constant(self, value):
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def add_token(self, token):
+        kind = token_kind(token)
+        # 1 and 1.0 are equal as keys, so the kind is part of the key.
+        value_index = self.constant_indices.get((kind, token.value))
+        if value_index is None:
+            value_index = self.constant_indices[kind, token.value] = self.add_constant(token.value)
+        self.token_kinds.append(kind)
+        self.token_values.append(value_index)
+        return len(self.token_kinds) - 1
+
+    def children(self, index):
+        sizes = self.sizes
+        child = index + 1
+        end = index + sizes[index]
+        while child < end:
+            yield child
+            child += sizes[child]
+
+    def subtree(self, index):
+        return range(index, index + self.sizes[index])
+
+    def token_type(self, index, offset=0):
+        return KIND_TYPES[self.token_kinds[self.tokens[index] + offset]]
+
+    def value(self, index, offset=0):
+        return self.constants[self.token_values[self.tokens[index] + offset]]
+
+    def name(self, index):
+        return self.value(index) if self.flags[index] & FLAG_NAMED else None
+
+    def arg_names(self, index):
+        first = 1 if self.flags[index] & FLAG_NAMED else 0
+        return [self.value(index, offset) for offset in range(first, first + self.data[index])]
+
+    def constant(self, index):
+        return self.constants[self.data[index]]
+
+    def pos_beg(self, index):
+        return Position(self.starts[index], self.source)
+
+    def pos_end(self, index):
+        if self.flags[index] & FLAG_LINE_END:
+            return LineEndPosition(self.ends[index], self.source)
+        return Position(self.ends[index], self.source)
+
+
+def flatten(root):
+    ast = FlatAST(root.pos_beg.source)
+    parents = []
+    indices = {}
+    pending = [(root, -1, 0)]
+
+    while pending:
+        node, parent, flags = pending.pop()
+        index = len(parents)
+        parents.append(parent)
+        indices[id(node)] = index
+        children = [(child, 0) for child in iter_child_nodes(node)]
+        token = -1
+        data = 0
+
+        if isinstance(node, (NumberNode, StringNode)):
+            token = ast.add_token(node.tok)
+        elif isinstance(node, (VarAccessNode, VarAssignNode)):
+            token = ast.add_token(node.var_name_token)
+        elif isinstance(node, (BinOpNode, UnaryOpNode)):
+            token = ast.add_token(node.operator_token)
+        elif isinstance(node, IfNode):
+            children = []
+            for condition, expr, null_check in node.cases:
+                children.append((condition, 0))
+                children.append((expr, FLAG_NULL_CASE if null_check else 0))
+            if node.else_case:
+                expr, null_check = node.else_case
+                children.append((expr, FLAG_NULL_CASE if null_check else 0))
+                flags |= FLAG_ELSE
+        elif isinstance(node, ForNode):
+            token = ast.add_token(node.var_name_token)
+            if node.step_value_node:
+                flags |= FLAG_STEP
+        elif isinstance(node, FuncDefNode):
+            token = len(ast.token_kinds)
+            if node.var_name_token:
+                ast.add_token(node.var_name_token)
+                flags |= FLAG_NAMED
+            for arg_name_token in node.arg_name_tokens:
+                ast.add_token(arg_name_token)
+            data = len(node.arg_name_tokens)
+        elif isinstance(node, CallNode):
+            if node.tail_call:
+                flags |= FLAG_TAIL_CALL
+            if node.tail_null_check:
+                flags |= FLAG_TAIL_NULL_CHECK
+        elif isinstance(node, ConstNode):
+            data = ast.add_constant(node.value)
+        elif isinstance(node, InvariantNode):
+            data = indices[id(node.loop_node)]
+
+        if isinstance(node, (WhileNode, ForNode, FuncDefNode)) and node.null_check:
+            flags |= FLAG_NULL_CHECK
+        if isinstance(node, (WhileNode, ForNode, ListNode)) and node.value_used:
+            flags |= FLAG_VALUE_USED
+        if type(node.pos_end) is LineEndPosition:
+            flags |= FLAG_LINE_END
+
+        ast.kinds.append(NODE_KINDS[type(node)])
+        ast.flags.append(flags)
+        ast.tokens.append(token)
+        ast.data.append(data)
+        ast.starts.append(node.pos_beg.index)
+        ast.ends.append(node.pos_end.index)
+        pending.extend((child, index, child_flags) for child, child_flags in reversed(children))
+
+    # Every subtree ends where the next one at its level begins, so the sizes
+    # add up from the last node back.
+    ast.sizes = array('I', [1]) * len(parents)
+    for index in range(len(parents) - 1, 0, -1):
+        ast.sizes[parents[index]] += ast.sizes[index]
+    return ast
+
+
+# The same text dump_tree gives for the tree the FlatAST was made from.
+def dump_flat(ast, index=0, indent=0):
+    pad = '  ' * indent
+    kind = ast.kinds[index]
+    if kind == NODE_NUMBER or kind == NODE_STRING:
+        return f"{pad}{ast.token_type(index)}:{ast.value(index)!r}"
+    if kind == NODE_VAR_ACCESS:
+        return f"{pad}{Token(ast.token_type(index), ast.value(index))!r}"
+    if kind == NODE_CONST:
+        return f"{pad}CONST:{ast.constant(index)!r}"
+
+    if kind == NODE_VAR_ASSIGN:
+        header = f"{pad}VarAssignNode {ast.value(index)}"
+    elif kind == NODE_BIN_OP or kind == NODE_UNARY_OP:
+        header = f"{pad}{NODE_NAMES[kind]} {Token(ast.token_type(index), ast.value(index))!r}"
+    elif kind == NODE_FOR:
+        header = f"{pad}ForNode {ast.value(index)}"
+    elif kind == NODE_FUNC_DEF:
+        args = ', '.join(ast.arg_names(index))
+        header = f"{pad}FuncDefNode {ast.name(index) or '<anonymous>'}({args})"
+    else:
+        header = f"{pad}{NODE_NAMES[kind]}"
+
+    return '\n'.join([header] + [dump_flat(ast, child, indent + 1) for child in ast.children(index)])
@@ -0,0 +1,260 @@
+from .interpreter import *
+
+BUILTIN_RESULT_TYPES = {
+    'PRINT': (BuiltInFunction.print, Number),
+    'INPUT': (BuiltInFunction.input, String),
+    'IS_NUM': (BuiltInFunction.is_number, Number),
+    'IS_STR': (BuiltInFunction.is_string, Number),
+    'IS_LIST': (BuiltInFunction.is_list, Number),
+    'IS_FUN': (BuiltInFunction.is_function, Number),
+    'MEMO': (BuiltInFunction.memo, BaseFunction),
+    'MEMO_INFO': (BuiltInFunction.memo_info, List)
+}
+
+BUILTIN_PREDICATES = {
+    'IS_NUM': Number,
+    'IS_STR': String,
+    'IS_LIST': List,
+    'IS_FUN': BaseFunction
+}
+
+NUMERIC_OPERANDS = (NumberNode, ConstNode, VarAccessNode, BinOpNode, UnaryOpNode)
+
+
+def value_type(value):
+    for value_class in (Number, String, List, BaseFunction):
+        if isinstance(value, value_class):
+            return value_class
+    return None
+
+
+def join(a, b):
+    return a if a is b else None
+
+
+def join_envs(a, b):
+    return {name: a[name] for name in a if name in b and a[name] is b[name]}
+
+
+def type_name(value_class):
+    return value_class.__name__ if value_class else 'Unknown'
+
+
+# ------------- TYPE INFERENCE --------------
+
+class TypeInference:
+    def __init__(self, symbol_table=global_symbol_table):
+        self.symbol_table = symbol_table
+        self.types = {}
+        # Every name a program run against the table has bound. With dynamic
+        # scoping a function may run under any caller's frame, so only names
+        # outside this set are known to resolve to the global table. A global
+        # still keeps the type it has now only until a program rebinds it;
+        # numeric_value checks the values it reads rather than trusting this.
+        self.bound_names = bound_names(symbol_table).names if symbol_table is not None else set()
+
+    def infer(self, node):
+        if self.symbol_table is not None:
+            bound_names(self.symbol_table).add(node)
+
+        env = {}
+        if self.symbol_table is not None:
+            env = {name: value_type(value) for name, value in self.symbol_table.symbols.items()}
+        self.visit(node, env)
+        return self.types
+
+    def annotate(self, node):
+        types = self.infer(node)
+        for child in walk(node):
+            if isinstance(child, BinOpNode):
+                child.numeric = child.operator_token.type != TOK_DOT and \
+                    self.numeric_operand(child.left_node) and self.numeric_operand(child.right_node)
+            elif isinstance(child, UnaryOpNode):
+                child.numeric = child.operator_token.type != TOK_PLUS and self.numeric_operand(child.node)
+        return types
+
+    def numeric_operand(self, node):
+        return isinstance(node, NUMERIC_OPERANDS) and self.types.get(node) is Number
+
+    def type_of(self, node):
+        return self.types.get(node)
+
+    def global_type(self, name):
+        if self.symbol_table is None or name in self.bound_names:
+            return None
+        return value_type(self.symbol_table.symbols.get(name))
+
+    def lookup(self, name, env):
+        return env[name] if name in env else self.global_type(name)
+
+    # ------------ visitors ------------
+
+    def visit(self, node, env):
+        method = getattr(self, f'visit_{type(node).__name__}', self.no_visit_method)
+        value_class = method(node, env)
+        self.types[node] = value_class
+        return value_class
+
+    def no_visit_method(self, node, env):
+        raise Exception(f'No visit_{type(node).__name__} method defined')
+
+    @staticmethod
+    def visit_NumberNode(node, env):
+        return Number
+
+    @staticmethod
+    def visit_StringNode(node, env):
+        return String
+
+    @staticmethod
+    def visit_ConstNode(node, env):
+        return value_type(node.value)
+
+    def visit_InvariantNode(self, node, env):
+        return self.visit(node.node, env)
+
+    def visit_VarAccessNode(self, node, env):
+        return self.lookup(node.var_name_token.value, env)
+
+    def visit_VarAssignNode(self, node, env):
+        value_class = self.visit(node.value_node, env)
+        env[node.var_name_token.value] = value_class
+        return value_class
+
+    def visit_BinOpNode(self, node, env):
+        left = self.visit(node.left_node, env)
+
+        if node.operator_token.type == TOK_KEYWORD:
+            # The right side of AND/OR is not guaranteed to run.
+            right_env = dict(env)
+            right = self.visit(node.right_node, right_env)
+            joined = join_envs(env, right_env)
+            env.clear()
+            env.update(joined)
+        else:
+            right = self.visit(node.right_node, env)
+
+        if node.operator_token.type == TOK_DOT:
+            return None
+        if left is Number and right is Number:
+            return Number
+        if node.operator_token.type == TOK_PLUS and left is String and right is String:
+            return String
+        if node.operator_token.type == TOK_MULT and {left, right} == {String, Number}:
+            return String
+        if left is List and node.operator_token.type in (TOK_PLUS, TOK_MINUS, TOK_MULT):
+            return List
+        return None
+
+    def visit_UnaryOpNode(self, node, env):
+        operand = self.visit(node.node, env)
+        if node.operator_token.type == TOK_MINUS:
+            return operand if operand in (Number, String, List) else None
+        if node.operator_token.is_match(TOK_KEYWORD, 'NOT'):
+            return Number if operand is Number else None
+        return operand
+
+    def visit_IfNode(self, node, env):
+        branches = []
+
+        for condition, expr, null_check in node.cases:
+            self.visit(condition, env)
+            branch_env = dict(env)
+            self.narrow(condition, branch_env)
+            value_class = self.visit(expr, branch_env)
+            branches.append((Number if null_check else value_class, branch_env))
+
+        if node.else_case:
+            expr, null_check = node.else_case
+            branch_env = dict(env)
+            value_class = self.visit(expr, branch_env)
+            branches.append((Number if null_check else value_class, branch_env))
+        else:
+            branches.append((Number, dict(env)))
+
+        value_class, joined = branches[0]
+        for branch_class, branch_env in branches[1:]:
+            value_class = join(value_class, branch_class)
+            joined = join_envs(joined, branch_env)
+
+        env.clear()
+        env.update(joined)
+        return value_class
+
+    def narrow(self, condition, env):
+        if not isinstance(condition, CallNode) or len(condition.arg_nodes) != 1:
+            return
+        if not isinstance(condition.node_to_call, VarAccessNode) or not isinstance(condition.arg_nodes[0], VarAccessNode):
+            return
+
+        predicate = condition.node_to_call.var_name_token.value
+        if predicate in BUILTIN_PREDICATES and self.trusted_builtin(predicate):
+            env[condition.arg_nodes[0].var_name_token.value] = BUILTIN_PREDICATES[predicate]
+
+    def visit_WhileNode(self, node, env):
+        head = dict(env)
+        while True:
+            condition_env = dict(head)
+            self.visit(node.condition_node, condition_env)
+            body_env = dict(condition_env)
+            self.visit(node.body_node, body_env)
+
+            next_head = join_envs(head, body_env)
+            if next_head == head:
+                break
+            head = next_head
+
+        env.clear()
+        env.update(condition_env)
+        return Number if node.null_check else List
+
+    def visit_ForNode(self, node, env):
+        self.visit(node.start_value_node, env)
+        self.visit(node.end_value_node, env)
+        if node.step_value_node:
+            self.visit(node.step_value_node, env)
+
+        head = dict(env)
+        while True:
+            body_env = dict(head)
+            body_env[node.var_name_token.value] = Number
+            self.visit(node.body_node, body_env)
+
+            next_head = join_envs(head, body_env)
+            if next_head == head:
+                break
+            head = next_head
+
+        env.clear()
+        env.update(head)
+        return Number if node.null_check else List
+
+    def visit_FuncDefNode(self, node, env):
+        self.visit(node.body_node, {})
+        if node.var_name_token:
+            env[node.var_name_token.value] = BaseFunction
+        return BaseFunction
+
+    def visit_CallNode(self, node, env):
+        self.visit(node.node_to_call, env)
+        for arg_node in node.arg_nodes:
+            self.visit(arg_node, env)
+
+        if isinstance(node.node_to_call, VarAccessNode):
+            name = node.node_to_call.var_name_token.value
+            if name in BUILTIN_RESULT_TYPES and self.trusted_builtin(name):
+                return BUILTIN_RESULT_TYPES[name][1]
+        return None
+
+    def trusted_builtin(self, name):
+        return self.symbol_table is not None and name not in self.bound_names and \
+            self.symbol_table.symbols.get(name) is BUILTIN_RESULT_TYPES[name][0]
+
+    def visit_ListNode(self, node, env):
+        for element_node in node.element_nodes:
+            self.visit(element_node, env)
+        return List
+
+
+def infer_types(node, symbol_table=global_symbol_table):
+    return TypeInference(symbol_table).infer(node)
@@ -1,10 +1,19 @@
+import operator
+import sys
+import weakref
+from collections import OrderedDict
+
 from .parser import *
 from .error import *
 
 
 # ---------------- VALUES -------------------
 
+# Every intermediate result is a Value, so values keep their attributes in
+# slots rather than a dict.
 class Value:
+    __slots__ = ('pos_beg', 'pos_end', 'context')
+
     def __init__(self):
         self.set_pos()
         self.set_context()
@@ -84,6 +93,8 @@ class Value:
 
 
 class Number(Value):
+    __slots__ = ('value', 'other')
+
     def __init__(self, value):
         super().__init__()
         self.value = value
@@ -201,6 +212,8 @@ Number.false = Number(0)
 
 
 class String(Value):
+    __slots__ = ('value',)
+
     def __init__(self, value):
         super().__init__()
         self.value = value
@@ -234,6 +247,8 @@ class String(Value):
 
 
 class BaseFunction(Value):
+    __slots__ = ('name',)
+
     def __init__(self, name):
         super().__init__()
         self.name = name or "<anonymous>"
@@ -282,15 +297,59 @@ class BaseFunction(Value):
 
 
 class Function(BaseFunction):
-    def __init__(self, name, body_node, arg_names, null_check):
+    __slots__ = ('body_node', 'arg_names', 'null_check', 'interpreter', 'body_names')
+
+    capture_free_names = True
+    # free_names of each function body, computed on first use.
+    captures = weakref.WeakKeyDictionary()
+
+    def __init__(self, name, body_node, arg_names, null_check, interpreter=None):
         super().__init__(name)
         self.body_node = body_node
         self.arg_names = arg_names
         self.null_check = null_check
+        self.interpreter = interpreter
+        self.body_names = False
+
+    def set_context(self, context=None):
+        # Holding a function frame would keep every variable of it and its
+        # callers alive for as long as the function value lives, so only the
+        # names the body reads are captured.
+        if context is not None and context is not self.context and self.capture_free_names \
+                and context.parent is not None and type(context) is not Capture:
+            context = self.capture(context)
+        self.context = context
+        return self
+
+    def capture(self, context):
+        captures = self.body_names
+        if captures is False:
+            captures = self.captures.get(self.body_node, False)
+            if captures is False:
+                captures = self.captures[self.body_node] = free_names(self.body_node, self.arg_names)
+            self.body_names = captures
+        if captures is None:
+            return context
+
+        # A body that calls anything but a builtin could read any name through
+        # its callee and keeps the whole frame. Only the frame itself can
+        # rebind a name it sees, and should a callee become a builtin later the
+        # frame is just kept longer than it needs to be, so this is remembered
+        # for each frame and body.
+        if context.whole_frame_bodies is not None and self.body_node in context.whole_frame_bodies:
+            return context
+        names, callees = captures
+        symbol_table = context.symbol_table
+        if all(isinstance(symbol_table.get(name), BuiltInFunction) for name in callees):
+            return Capture(context, names)
+        if context.whole_frame_bodies is None:
+            context.whole_frame_bodies = set()
+        context.whole_frame_bodies.add(self.body_node)
+        return context
 
     def execute(self, args):
         res = RTResult()
-        interpreter = Interpreter()
+        interpreter = self.interpreter or Interpreter()
         exec_ctx = self.generate_new_context()
 
         res.register(self.check_and_populate_args(self.arg_names, args, exec_ctx))
@@ -303,8 +362,10 @@ class Function(BaseFunction):
         return res.success(Number.null if self.null_check else value)
 
     def copy(self):
-        copy = Function(self.name, self.body_node, self.arg_names, self.null_check)
-        copy.set_context(self.context)
+        copy = Function(self.name, self.body_node, self.arg_names, self.null_check, self.interpreter)
+        # Already bound, so the capture isn't worked out again.
+        copy.context = self.context
+        copy.body_names = self.body_names
         copy.set_pos(self.pos_beg, self.pos_end)
         return copy
 
@@ -313,6 +374,8 @@ class Function(BaseFunction):
 
 
 class BuiltInFunction(BaseFunction):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -462,6 +525,45 @@ class BuiltInFunction(BaseFunction):
 
     execute_extend.arg_names = ["listA", "listB"]
 
+    def execute_memo(self, exec_ctx):
+        func = exec_ctx.symbol_table.get("func")
+        maxsize = exec_ctx.symbol_table.get("maxsize")
+
+        if not isinstance(func, BaseFunction):
+            return RTResult().failure(RTError(
+                self.pos_beg, self.pos_end,
+                "First argument must be function",
+                exec_ctx
+            ))
+
+        if not isinstance(maxsize, Number) or not isinstance(maxsize.value, int) or maxsize.value < 0:
+            return RTResult().failure(RTError(
+                self.pos_beg, self.pos_end,
+                "Second argument must be a non-negative integer",
+                exec_ctx
+            ))
+
+        return RTResult().success(MemoFunction(func, MemoCache(maxsize.value)))
+
+    execute_memo.arg_names = ["func", "maxsize"]
+
+    def execute_memo_info(self, exec_ctx):
+        func = exec_ctx.symbol_table.get("func")
+
+        if not isinstance(func, MemoFunction):
+            return RTResult().failure(RTError(
+                self.pos_beg, self.pos_end,
+                "Argument must be a memoized function",
+                exec_ctx
+            ))
+
+        cache = func.cache
+        return RTResult().success(List([
+            Number(cache.hits), Number(cache.misses), Number(len(cache.results)), Number(cache.maxsize)
+        ]))
+
+    execute_memo_info.arg_names = ["func"]
+
 
 BuiltInFunction.print = BuiltInFunction("print")
 BuiltInFunction.input = BuiltInFunction("input")
@@ -472,9 +574,93 @@ BuiltInFunction.is_function = BuiltInFunction("is_function")
 BuiltInFunction.append = BuiltInFunction("append")
 BuiltInFunction.pop = BuiltInFunction("pop")
 BuiltInFunction.extend = BuiltInFunction("extend")
+BuiltInFunction.memo = BuiltInFunction("memo")
+BuiltInFunction.memo_info = BuiltInFunction("memo_info")
+
+
+# Results of a memoized function, least recently used first. A maxsize of 0
+# keeps every result.
+class MemoCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.results.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.results.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.results[key] = value
+        if self.maxsize and len(self.results) > self.maxsize:
+            self.results.popitem(last=False)
+
+
+class MemoFunction(BaseFunction):
+    __slots__ = ('func', 'cache')
+
+    def __init__(self, func, cache):
+        super().__init__(func.name)
+        self.func = func
+        self.cache = cache
+
+    def execute(self, args):
+        res = RTResult()
+        key, value, error = self.lookup(args)
+        if error:
+            return res.failure(error)
+        if value is not None:
+            return res.success(value.copy())
+
+        value = res.register(self.bound_func().execute(args))
+        if res.error:
+            return res
+
+        self.remember(key, value)
+        return res.success(value)
+
+    # The cache key for the arguments and what the cache holds for it, or an
+    # error when they can't key the cache.
+    def lookup(self, args):
+        # Lists are mutable, so they can neither key the cache nor be handed
+        # out again from it.
+        for arg in args:
+            if not isinstance(arg, (Number, String)):
+                return None, None, RTError(
+                    self.pos_beg, self.pos_end,
+                    f"Memoized function '{self.name}' only accepts numbers and strings",
+                    self.context
+                )
+
+        key = tuple((type(arg.value), arg.value) for arg in args)
+        return key, self.cache.get(key), None
+
+    def bound_func(self):
+        return self.func.copy().set_context(self.context).set_pos(self.pos_beg, self.pos_end)
+
+    def remember(self, key, value):
+        if not isinstance(value, List):
+            self.cache.put(key, value.copy())
+
+    def copy(self):
+        copy = MemoFunction(self.func, self.cache)
+        copy.set_context(self.context)
+        copy.set_pos(self.pos_beg, self.pos_end)
+        return copy
+
+    def __repr__(self):
+        return f"<memoized function {self.name}>"
 
 
 class List(Value):
+    __slots__ = ('elements',)
+
     def __init__(self, elements):
         super().__init__()
         self.elements = elements
@@ -638,6 +824,44 @@ class Context:
         self.parent = parent
         self.parent_entry_pos = parent_entry_pos
         self.symbol_table = None
+        self.tail_calls = 0
+        self.traced = None
+        # Bodies of functions bound here that keep this whole frame.
+        self.whole_frame_bodies = None
+
+    # A copy of this context and its parents that keeps what a traceback
+    # shows and none of their symbol tables.
+    def trace(self):
+        pending = []
+        context = self
+        while context and not context.traced:
+            pending.append(context)
+            context = context.parent
+
+        traced = context.traced if context else None
+        for context in reversed(pending):
+            traced = Context(context.display_name, traced, context.parent_entry_pos)
+            traced.tail_calls = context.tail_calls
+            traced.traced = traced
+            context.traced = traced
+        return traced
+
+
+# Stands in for the context a function was bound to, holding copies of only
+# the names the function reads. Globals stay in the root table and are read
+# live from there.
+class Capture(Context):
+    def __init__(self, context, names):
+        super().__init__(context.display_name, context.parent.trace(), context.parent_entry_pos)
+        self.tail_calls = context.tail_calls
+
+        symbol_table = context.symbol_table
+        root_symbols = symbol_table.root.symbols
+        self.symbol_table = SymbolTable(symbol_table.root)
+        for name in names:
+            value = symbol_table.get(name)
+            if value is not None and value is not root_symbols.get(name):
+                self.symbol_table.set(name, value.copy().set_context(self))
 
 
 # ------------- SYMBOL TABLE ----------------
@@ -646,11 +870,18 @@ class SymbolTable:
     def __init__(self, parent=None):
         self.symbols = {}
         self.parent = parent
+        self.root = parent.root if parent else self
 
     def get(self, name):
-        value = self.symbols.get(name, None)
-        if value is None and self.parent:
-            return self.parent.get(name)
+        # A loop rather than recursion, so deep call chains don't exhaust the
+        # Python stack. Subclasses in the chain resolve names their own way.
+        table = self
+        value = table.symbols.get(name, None)
+        while value is None and table.parent:
+            table = table.parent
+            if type(table) is not SymbolTable:
+                return table.get(name)
+            value = table.symbols.get(name, None)
         return value
 
     def set(self, name, value):
@@ -660,9 +891,197 @@ class SymbolTable:
         del self.symbols[name]
 
 
+# -------------- BOUND NAMES ----------------
+
+# The names bound by every program run against one global table, whether
+# optimized or not. function_names are those bound inside a function, as
+# an argument or in its body. A function's scope is its caller's, so any of
+# them can hide the global of that name from the functions it calls.
+#
+# The passes that look at globals only trust a name no program has bound
+# where it could hide one. A program run later can still rebind a global,
+# or bind a name an earlier program relied on. The resolver checks at run
+# time, so it always sees the latest names. What the optimizer folded
+# stays as it was, and numeric_value guards against a changed type.
+class BoundNames:
+    def __init__(self):
+        self.names = set()
+        self.function_names = set()
+
+    def add(self, node):
+        pending = [(node, False)]
+        while pending:
+            node, in_function = pending.pop()
+            if isinstance(node, (VarAssignNode, ForNode)):
+                self.bind(node.var_name_token.value, in_function)
+            elif isinstance(node, FuncDefNode):
+                if node.var_name_token:
+                    self.bind(node.var_name_token.value, in_function)
+                for arg_name in node.arg_name_tokens:
+                    self.bind(arg_name.value, True)
+                pending.append((node.body_node, True))
+                continue
+            pending.extend((child, in_function) for child in iter_child_nodes(node))
+
+    def bind(self, name, in_function):
+        self.names.add(name)
+        if in_function:
+            self.function_names.add(name)
+
+
+bound_names_by_table = weakref.WeakKeyDictionary()
+
+
+def bound_names(symbol_table):
+    names = bound_names_by_table.get(symbol_table)
+    if names is None:
+        names = bound_names_by_table[symbol_table] = BoundNames()
+    return names
+
+
+# ------------- ACTIVATIONS -----------------
+
+ACTIVATION_POOL_SIZE = 64
+
+
+class ActivationPool:
+    def __init__(self, limit=ACTIVATION_POOL_SIZE):
+        self.limit = limit
+        self.free = []
+        self.created = 0
+        self.reused = 0
+        # What reference_counts gives for a record nothing else refers to, or
+        # None when reference counts can't tell, which turns recycling off.
+        self.references = None
+        if hasattr(sys, 'getrefcount'):
+            self.calibrate()
+
+    def acquire(self, display_name, parent, parent_entry_pos):
+        if self.free:
+            context = self.free.pop()
+            context.display_name = display_name
+            context.parent = parent
+            context.parent_entry_pos = parent_entry_pos
+            context.tail_calls = 0
+            context.traced = None
+            context.whole_frame_bodies = None
+            context.symbol_table.parent = parent.symbol_table
+            context.symbol_table.root = parent.symbol_table.root
+            self.reused += 1
+            return context
+
+        context = Context(display_name, parent, parent_entry_pos)
+        context.symbol_table = SymbolTable(parent.symbol_table)
+        self.created += 1
+        return context
+
+    def release(self, context):
+        # A record is only recycled when nothing but its own locals refers to
+        # it: a function defined inside, a list argument or an error keeps it
+        # alive exactly as before.
+        if len(self.free) >= self.limit or self.references is None:
+            return
+        if any(count > free for count, free in zip(self.reference_counts(context), self.references)):
+            return
+
+        context.symbol_table.symbols.clear()
+        context.parent = None
+        context.symbol_table.parent = None
+        self.free.append(context)
+
+    # The most references any value the record owns has, then those of the
+    # record less one for each value it owns, then those of its symbol table.
+    @staticmethod
+    def reference_counts(context):
+        value_count = 0
+        owned = 0
+        for value in context.symbol_table.symbols.values():
+            if value.context is context:
+                value_count = max(value_count, sys.getrefcount(value))
+                owned += 1
+        return value_count, sys.getrefcount(context) - owned, sys.getrefcount(context.symbol_table)
+
+    # How many references the calling frames hold themselves depends on how
+    # the running CPython counts them, so rather than assume the numbers,
+    # they are measured on a record only its own locals refer to. It's held
+    # the way the interpreter holds a record it releases: in a local of the
+    # caller, handed on as the argument. Anything else holding the record, a
+    # tracer included, only adds references and so keeps it from being
+    # recycled. Should one more reference not show in every count, they
+    # can't be trusted and nothing is recycled.
+    def calibrate(self):
+        parent = Context('<calibration>')
+        parent.symbol_table = SymbolTable()
+        context = Context('<calibration>', parent)
+        context.symbol_table = SymbolTable(parent.symbol_table)
+        context.symbol_table.set('value', Number(0).set_context(context))
+        references = self.measure(context)
+
+        held = [context, context.symbol_table, context.symbol_table.get('value')]
+        if all(count > free for count, free in zip(self.measure(context), references)):
+            self.references = references
+        del held
+
+    # Takes the record the way release() does.
+    def measure(self, context):
+        return self.reference_counts(context)
+
+
+activations = ActivationPool()
+
+
 # ------------- INTERPRETER -----------------
 
+NUMBER_OPERATIONS = {
+    TOK_PLUS: operator.add,
+    TOK_MINUS: operator.sub,
+    TOK_MULT: operator.mul,
+    TOK_DIV: operator.truediv,
+    TOK_POW: operator.pow,
+    TOK_ISEQ: lambda a, b: int(a == b),
+    TOK_NEQ: lambda a, b: int(a != b),
+    TOK_LT: lambda a, b: int(a < b),
+    TOK_GT: lambda a, b: int(a > b),
+    TOK_LEQ: lambda a, b: int(a <= b),
+    TOK_GEQ: lambda a, b: int(a >= b),
+    'AND': lambda a, b: int(a and b),
+    'OR': lambda a, b: int(a or b)
+}
+
+
+def short_circuit(node, left):
+    token = node.operator_token
+    if token.type != TOK_KEYWORD or not isinstance(left, Number):
+        return None
+    if left.is_true() == (token.value == 'AND'):
+        return None
+    return Number(int(left.value)).set_context(left.context).set_pos(node.pos_beg, node.pos_end)
+
+
+# numeric_value gives a Value instead of a raw number when a variable the
+# inference took for a number holds something else, as a later program can
+# rebind a global. These move between the two.
+def numeric_result(value):
+    return value.value if type(value) is Number else value
+
+
+def raw_value(value):
+    return value.value if isinstance(value, Value) else value
+
+
+def boxed(value, node, context):
+    if isinstance(value, Value):
+        return value
+    return Number(value).set_context(context).set_pos(node.pos_beg, node.pos_end)
+
+
 class Interpreter:
+    inline_calls = True
+    eliminate_tail_calls = True
+    # The activation whose body is running and the tail call it left behind.
+    tail_frame = None
+    tail_call = None
+
     def execute(self, node, context):
         method_name = f'execute_{type(node).__name__}'
         method = getattr(self, method_name, self.no_execute_method)
@@ -679,6 +1098,20 @@ class Interpreter:
     def execute_StringNode(node, context):
         return RTResult().success(String(node.tok.value).set_context(context).set_pos(node.pos_beg, node.pos_end))
 
+    @staticmethod
+    def execute_ConstNode(node, context):
+        return RTResult().success(node.value.set_context(context))
+
+    def execute_InvariantNode(self, node, context):
+        value = node.cached(context)
+        if value is not None:
+            return RTResult().success(value)
+
+        res = self.execute(node.node, context)
+        if not res.error and isinstance(res.value, (Number, String)):
+            node.remember(context, res.value)
+        return res
+
     @staticmethod
     def execute_VarAccessNode(node, context):
         res = RTResult()
@@ -706,14 +1139,28 @@ class Interpreter:
         return res.success(value)
 
     def execute_BinOpNode(self, node, context):
+        if node.numeric:
+            return self.execute_numeric(node, context)
+
         res = RTResult()
         left = res.register(self.execute(node.left_node, context))
         if res.error:
             return res
+
+        if node.operator_token.type == TOK_KEYWORD:
+            result = short_circuit(node, left)
+            if result is not None:
+                return res.success(result)
+
         right = res.register(self.execute(node.right_node, context))
         if res.error:
             return res
 
+        return self.apply_bin_op(node, left, right)
+
+    @staticmethod
+    def apply_bin_op(node, left, right):
+        res = RTResult()
         error = None
         result = None
 
@@ -752,6 +1199,9 @@ class Interpreter:
             return res.success(result.set_pos(node.pos_beg, node.pos_end))
 
     def execute_UnaryOpNode(self, node, context):
+        if node.numeric:
+            return self.execute_numeric(node, context)
+
         res = RTResult()
         number = res.register(self.execute(node.node, context))
         if res.error:
@@ -769,6 +1219,75 @@ class Interpreter:
         else:
             return res.success(number.set_pos(node.pos_beg, node.pos_end))
 
+    def execute_numeric(self, node, context):
+        value, error = self.numeric_value(node, context)
+        if error:
+            return RTResult().failure(error)
+        if isinstance(value, Value):
+            return RTResult().success(value)
+        return RTResult().success(Number(value).set_context(context).set_pos(node.pos_beg, node.pos_end))
+
+    def numeric_value(self, node, context):
+        if isinstance(node, NumberNode):
+            return node.tok.value, None
+
+        if isinstance(node, ConstNode):
+            return node.value.value, None
+
+        if isinstance(node, VarAccessNode):
+            value = context.symbol_table.get(node.var_name_token.value)
+            if type(value) is Number:
+                return value.value, None
+
+        elif isinstance(node, BinOpNode) and node.numeric:
+            left, error = self.numeric_value(node.left_node, context)
+            if error:
+                return None, error
+
+            token = node.operator_token
+            if isinstance(left, Value):
+                if token.type == TOK_KEYWORD:
+                    result = short_circuit(node, left)
+                    if result is not None:
+                        return numeric_result(result), None
+            elif token.type == TOK_KEYWORD and bool(left) != (token.value == 'AND'):
+                return int(left), None
+
+            right, error = self.numeric_value(node.right_node, context)
+            if error:
+                return None, error
+
+            if isinstance(left, Value) or isinstance(right, Value):
+                res = self.apply_bin_op(node, boxed(left, node.left_node, context),
+                                        boxed(right, node.right_node, context))
+                if res.error:
+                    return None, res.error
+                return numeric_result(res.value), None
+            if token.type == TOK_DIV and right == 0:
+                return None, RTError(node.right_node.pos_beg, node.right_node.pos_end, 'Division by zero', context)
+            return NUMBER_OPERATIONS[token.value if token.type == TOK_KEYWORD else token.type](left, right), None
+
+        elif isinstance(node, UnaryOpNode) and node.numeric:
+            operand, error = self.numeric_value(node.node, context)
+            if error:
+                return None, error
+            if isinstance(operand, Value):
+                if node.operator_token.type == TOK_MINUS:
+                    result, error = operand.multiply(Number(-1))
+                else:
+                    result, error = operand.logical_not()
+                if error:
+                    return None, error
+                return numeric_result(result.set_pos(node.pos_beg, node.pos_end)), None
+            if node.operator_token.type == TOK_MINUS:
+                return operand * -1, None
+            return 1 if operand == 0 else 0, None
+
+        res = self.execute(node, context)
+        if res.error:
+            return None, res.error
+        return numeric_result(res.value), None
+
     def execute_IfNode(self, node, context):
         res = RTResult()
 
@@ -794,7 +1313,8 @@ class Interpreter:
 
     def execute_WhileNode(self, node, context):
         res = RTResult()
-        elements = []
+        elements = [] if node.value_used and not node.null_check else None
+        node.generation += 1
 
         while True:
             condition = res.register(self.execute(node.condition_node, context))
@@ -804,58 +1324,70 @@ class Interpreter:
             if not condition.is_true():
                 break
 
-            elements.append(res.register(self.execute(node.body_node, context)))
+            value = res.register(self.execute(node.body_node, context))
             if res.error:
                 return res
+            if elements is not None:
+                elements.append(value)
 
         return res.success(
-            Number.null if node.null_check else List(elements).set_context(context).set_pos(node.pos_beg, node.pos_end))
+            Number.null if elements is None else List(elements).set_context(context).set_pos(node.pos_beg, node.pos_end))
 
     def execute_ForNode(self, node, context):
         res = RTResult()
-        elements = []
+        elements = [] if node.value_used and not node.null_check else None
+        node.generation += 1
 
-        start_value = res.register(self.execute(node.start_value_node, context))
-        if res.error:
-            return res
+        # Bounds are read as raw numbers; literals and plain variables skip
+        # the execute dispatch entirely.
+        i, error = self.numeric_value(node.start_value_node, context)
+        if error:
+            return res.failure(error)
+        i = raw_value(i)
 
-        end_value = res.register(self.execute(node.end_value_node, context))
-        if res.error:
-            return res
+        end, error = self.numeric_value(node.end_value_node, context)
+        if error:
+            return res.failure(error)
+        end = raw_value(end)
 
         if node.step_value_node:
-            step_value = res.register(self.execute(node.step_value_node, context))
-            if res.error:
-                return res
+            step, error = self.numeric_value(node.step_value_node, context)
+            if error:
+                return res.failure(error)
+            step = raw_value(step)
         else:
-            step_value = Number(1)
-
-        i = start_value.value
+            step = 1
 
-        if step_value.value >= 0:
-            condition = i < end_value.value
-        else:
-            condition = i > end_value.value
+        # One counter per loop, updated in place. Every read of a variable
+        # copies its value, so the body never holds on to the counter itself.
+        in_range = operator.lt if step >= 0 else operator.gt
+        var_name = node.var_name_token.value
+        symbol_table = context.symbol_table
+        counter = Number(i)
+        body_node = node.body_node
+        execute_body = getattr(self, f'execute_{type(body_node).__name__}', self.no_execute_method)
 
-        while condition:
-            context.symbol_table.set(node.var_name_token.value, Number(i))
-            i += step_value.value
+        while in_range(i, end):
+            counter.value = i
+            symbol_table.set(var_name, counter)
+            i += step
 
-            elements.append(res.register(self.execute(node.body_node, context)))
+            value = res.register(execute_body(body_node, context))
             if res.error:
                 return res
+            if elements is not None:
+                elements.append(value)
 
         return res.success(
-            Number.null if node.null_check else List(elements).set_context(context).set_pos(node.pos_beg, node.pos_end))
+            Number.null if elements is None else List(elements).set_context(context).set_pos(node.pos_beg, node.pos_end))
 
-    @staticmethod
-    def execute_FuncDefNode(node, context):
+    def execute_FuncDefNode(self, node, context):
         res = RTResult()
 
         func_name = node.var_name_token.value if node.var_name_token else None
         body_node = node.body_node
         arg_names = [arg_name.value for arg_name in node.arg_name_tokens]
-        func_value = Function(func_name, body_node, arg_names, node.null_check).set_context(context).set_pos(
+        func_value = Function(func_name, body_node, arg_names, node.null_check, self).set_context(context).set_pos(
             node.pos_beg,
             node.pos_end)
 
@@ -865,6 +1397,11 @@ class Interpreter:
         return res.success(func_value)
 
     def execute_CallNode(self, node, context):
+        if self.inline_calls and isinstance(node.node_to_call, VarAccessNode):
+            callee = context.symbol_table.get(node.node_to_call.var_name_token.value)
+            if type(callee) is Function:
+                return self.call_function(node, callee, context)
+
         res = RTResult()
         args = []
 
@@ -884,15 +1421,94 @@ class Interpreter:
         return_value = return_value.copy().set_pos(node.pos_beg, node.pos_end).set_context(context)
         return res.success(return_value)
 
+    def call_function(self, node, callee, context):
+        res = RTResult()
+        args = []
+
+        for arg_node in node.arg_nodes:
+            args.append(res.register(self.execute(arg_node, context)))
+            if res.error:
+                return res
+
+        if node.checked_callee is not callee:
+            if len(args) != len(callee.arg_names):
+                value_to_call = callee.copy().set_context(context).set_pos(node.pos_beg, node.pos_end)
+                return res.failure(value_to_call.check_args(callee.arg_names, args).error)
+            node.checked_callee = callee
+
+        # A call whose value is the caller's own result is handed back to the
+        # loop below instead of growing the Python stack.
+        if node.tail_call and context is self.tail_frame and self.eliminate_tail_calls:
+            self.tail_call = (callee, args, node)
+            return res.success(Number.null)
+
+        exec_ctx = activations.acquire(callee.name, context, node.pos_beg)
+        callee.populate_args(callee.arg_names, args, exec_ctx)
+        del args
+        null_check = False
+
+        while True:
+            interpreter = callee.interpreter or Interpreter()
+            outer_frame = interpreter.tail_frame
+            interpreter.tail_frame = exec_ctx
+            value = res.register(interpreter.execute(callee.body_node, exec_ctx))
+            interpreter.tail_frame = outer_frame
+            tail_call = interpreter.tail_call
+            interpreter.tail_call = None
+            if res.error:
+                return res
+
+            null_check = null_check or callee.null_check
+            if tail_call is None:
+                break
+
+            callee, args, tail_node = tail_call
+            null_check = null_check or tail_node.tail_null_check
+            del value, tail_call
+            res.value = None
+
+            frame = self.replacement_frame(exec_ctx, callee)
+            callee.populate_args(callee.arg_names, args, frame)
+            del args
+            activations.release(exec_ctx)
+            exec_ctx = frame
+            del frame
+
+        return_value = (Number.null if null_check else value).copy() \
+            .set_pos(node.pos_beg, node.pos_end).set_context(context)
+        del value
+        res.value = None
+        activations.release(exec_ctx)
+        return res.success(return_value)
+
+    @staticmethod
+    def replacement_frame(frame, callee):
+        # The new activation takes over the caller's place in the traceback.
+        # Locals the callee does not shadow stay visible, as they would
+        # through the dynamic scope of the frame it replaces.
+        new_frame = activations.acquire(callee.name, frame.parent, frame.parent_entry_pos)
+        new_frame.tail_calls = frame.tail_calls + 1
+        for name, value in frame.symbol_table.symbols.items():
+            if name not in callee.arg_names:
+                new_frame.symbol_table.set(name, value)
+        return new_frame
+
     def execute_ListNode(self, node, context):
         res = RTResult()
-        elements = []
+        elements = [] if node.value_used else None
+        value = Number.null
 
         for element_node in node.element_nodes:
-            elements.append(res.register(self.execute(element_node, context)))
+            value = res.register(self.execute(element_node, context))
             if res.error:
                 return res
+            if elements is not None:
+                elements.append(value)
 
+        # An unused list only passes on its last value, which is what a
+        # script run returns.
+        if elements is None:
+            return res.success(value)
         return res.success(List(elements).set_context(context).set_pos(node.pos_beg, node.pos_end))
 
 
@@ -911,22 +1527,82 @@ global_symbol_table.set("IS_FUN", BuiltInFunction.is_function)
 global_symbol_table.set("APPEND", BuiltInFunction.append)
 global_symbol_table.set("POP", BuiltInFunction.pop)
 global_symbol_table.set("EXTEND", BuiltInFunction.extend)
+global_symbol_table.set("MEMO", BuiltInFunction.memo)
+global_symbol_table.set("MEMO_INFO", BuiltInFunction.memo_info)
+
 
+def run_program(name, text, engine='tree', optimize=False, dump=False, script=False):
+    # The whole text is lexed into a TokenBuffer first, so a lexing error is
+    # reported ahead of any syntax error.
+    tokens, error = RegexLex(name, text).create_buffer()
+    if error:
+        return None, error
 
-def run_program(name, text):
-    lexer = Lex(name, text)
-    tokens, lex_error = lexer.create_tokens()
-    if lex_error:
-        return None, lex_error
+    # The stack engine runs a tree as deep as its call depth, so it also
+    # gets to parse one that deep.
+    max_nesting = None
+    if engine == 'stack':
+        from .stack import MAX_CALL_DEPTH
+        max_nesting = MAX_CALL_DEPTH
 
-    parser = Parser(tokens)
+    parser = Parser(tokens, max_nesting)
     ast = parser.parse()
     if ast.error:
         return None, ast.error
 
-    interpreter = Interpreter()
+    bound_names(global_symbol_table).add(ast.node)
+
+    if optimize:
+        from .optimizer import Optimizer
+        with nesting_room(max_nesting):
+            ast.node = Optimizer(global_symbol_table).optimize(ast.node)
+
+    # A script keeps only the value of its last statement instead of
+    # collecting one per top-level statement.
+    mark_unused_values(ast.node, not script)
+    if script and ast.node.element_nodes:
+        mark_unused_values(ast.node.element_nodes[-1])
+
+    if dump:
+        print(dump_tree(ast.node))
+
     context = Context('<program>')
     context.symbol_table = global_symbol_table
-    result = interpreter.execute(ast.node, context)
+
+    if engine == 'vm':
+        from .bytecode import Compiler
+        from .vm import VM
+        result = VM().run(Compiler().compile(ast.node), context)
+    elif engine == 'closure':
+        from .closures import ClosureCompiler
+        result = ClosureCompiler().compile_program(ast.node)(context)
+    elif engine == 'python':
+        from .transpiler import Transpiler
+        program = Transpiler(name).transpile(ast.node)
+        # A tree too deep to transpile runs on the tree interpreter instead.
+        result = program.run(context) if program else Interpreter().execute(ast.node, context)
+    elif engine == 'quicken':
+        from .quickening import QuickeningInterpreter
+        result = QuickeningInterpreter().execute(ast.node, context)
+    elif engine == 'slots':
+        from .resolver import Resolver, SlotInterpreter
+        result = SlotInterpreter(global_symbol_table).execute(Resolver(global_symbol_table).resolve(ast.node), context)
+    elif engine == 'tiered':
+        from .transpiler import TieredInterpreter, Tiering
+        result = TieredInterpreter(Tiering()).execute(ast.node, context)
+    elif engine == 'unwind':
+        from .unwind import UnwindingInterpreter
+        result = UnwindingInterpreter().execute(ast.node, context)
+    elif engine == 'unboxed':
+        from .unboxed import UnboxedInterpreter
+        result = UnboxedInterpreter().execute(ast.node, context)
+    elif engine == 'stack':
+        from .stack import StackInterpreter
+        result = StackInterpreter().execute(ast.node, context)
+    elif engine == 'tree':
+        interpreter = Interpreter()
+        result = interpreter.execute(ast.node, context)
+    else:
+        raise ValueError(f"Unknown engine '{engine}'")
 
     return result.value, result.error
@@ -1,5 +1,7 @@
 from .position import *
 from .error import *
+from array import array
+import re
 import string
 
 DIGITS = "0123456789"
@@ -36,7 +38,7 @@ TOK_COMMA = 'COMMA'
 TOK_NEWLINE = 'NEWLINE'
 TOK_COLON = 'COLON'
 
-KEYWORDS = [
+KEYWORDS = {
     'VAR',
     'AND',
     'OR',
@@ -51,18 +53,19 @@ KEYWORDS = [
     'STEP',
     'FUNC',
     'END'
-]
+}
 
 
 class Token:
+    __slots__ = ('type', 'value', 'pos_beg', 'pos_end')
+
     def __init__(self, type_, value=None, pos_beg=None, pos_end=None):
         self.type = type_
         self.value = value
 
         if pos_beg:
             self.pos_beg = pos_beg.copy()
-            self.pos_end = pos_beg.copy()
-            self.pos_end.advance()
+            self.pos_end = pos_beg.following()
 
         if pos_end:
             self.pos_end = pos_end
@@ -76,6 +79,110 @@ class Token:
         return f'{self.type}'
 
 
+# -------------- TOKEN KINDS ------------------
+
+# Small integers for the token types, with one of their own for every
+# keyword, so the parser compares ints instead of type and value strings.
+# KIND_ERROR stands for the (None, error) pair a lexer leaves in place of a
+# token it could not make.
+KIND_INT = 0
+KIND_FLOAT = 1
+KIND_STR = 2
+KIND_ID = 3
+KIND_PLUS = 4
+KIND_MINUS = 5
+KIND_MULT = 6
+KIND_DIV = 7
+KIND_POW = 8
+KIND_EQ = 9
+KIND_ISEQ = 10
+KIND_NEQ = 11
+KIND_LT = 12
+KIND_GT = 13
+KIND_LEQ = 14
+KIND_GEQ = 15
+KIND_LPAR = 16
+KIND_RPAR = 17
+KIND_LSQUARE = 18
+KIND_RSQUARE = 19
+KIND_DOT = 20
+KIND_EOF = 21
+KIND_COMMA = 22
+KIND_NEWLINE = 23
+KIND_COLON = 24
+KIND_VAR = 25
+KIND_AND = 26
+KIND_OR = 27
+KIND_NOT = 28
+KIND_IF = 29
+KIND_ELSE = 30
+KIND_THEN = 31
+KIND_ELIF = 32
+KIND_WHILE = 33
+KIND_FOR = 34
+KIND_TO = 35
+KIND_STEP = 36
+KIND_FUNC = 37
+KIND_END = 38
+KIND_ERROR = 39
+
+TOKEN_KINDS = {
+    TOK_INT: KIND_INT,
+    TOK_FLOAT: KIND_FLOAT,
+    TOK_STR: KIND_STR,
+    TOK_ID: KIND_ID,
+    TOK_PLUS: KIND_PLUS,
+    TOK_MINUS: KIND_MINUS,
+    TOK_MULT: KIND_MULT,
+    TOK_DIV: KIND_DIV,
+    TOK_POW: KIND_POW,
+    TOK_EQ: KIND_EQ,
+    TOK_ISEQ: KIND_ISEQ,
+    TOK_NEQ: KIND_NEQ,
+    TOK_LT: KIND_LT,
+    TOK_GT: KIND_GT,
+    TOK_LEQ: KIND_LEQ,
+    TOK_GEQ: KIND_GEQ,
+    TOK_LPAR: KIND_LPAR,
+    TOK_RPAR: KIND_RPAR,
+    TOK_LSQUARE: KIND_LSQUARE,
+    TOK_RSQUARE: KIND_RSQUARE,
+    TOK_DOT: KIND_DOT,
+    TOK_EOF: KIND_EOF,
+    TOK_COMMA: KIND_COMMA,
+    TOK_NEWLINE: KIND_NEWLINE,
+    TOK_COLON: KIND_COLON
+}
+
+KEYWORD_KINDS = {
+    'VAR': KIND_VAR,
+    'AND': KIND_AND,
+    'OR': KIND_OR,
+    'NOT': KIND_NOT,
+    'IF': KIND_IF,
+    'ELSE': KIND_ELSE,
+    'THEN': KIND_THEN,
+    'ELIF': KIND_ELIF,
+    'WHILE': KIND_WHILE,
+    'FOR': KIND_FOR,
+    'TO': KIND_TO,
+    'STEP': KIND_STEP,
+    'FUNC': KIND_FUNC,
+    'END': KIND_END
+}
+
+KIND_TYPES = {kind: type_ for type_, kind in TOKEN_KINDS.items()}
+KIND_TYPES.update((kind, TOK_KEYWORD) for kind in KEYWORD_KINDS.values())
+
+
+def token_kind(token):
+    if isinstance(token, tuple):
+        return KIND_ERROR
+    if token.type == TOK_KEYWORD:
+        return KEYWORD_KINDS[token.value]
+    return TOKEN_KINDS[token.type]
+
+
 # ----------------- LEXER --------------------
 
 OPERATORS = {
@@ -95,7 +202,7 @@ class Lex:
     def __init__(self, name, text):
         self.name = name
         self.text = text
-        self.pos = Position(-1, 0, -1, name, text)
+        self.pos = Position(-1, Source(name, text))
         self.current_char = None
         self.advance()
 
@@ -266,3 +373,235 @@ class Lex:
             tok_type = TOK_GEQ
 
         return Token(tok_type, pos_beg=pos_beg, pos_end=self.pos)
+
+
+# -------------- REGEX LEXER -----------------
+
+# One alternative per token class of Lex.create_tokens, matched after any
+# blanks in front of the token. No two start with the same character, so
+# they're ordered by how common they are, and a character none of them
+# accepts is ILLEGAL.
+TOKEN_PATTERN = re.compile(r"""
+    [ \t]*
+    (?:
+        (?P<ID>[A-Za-z][A-Za-z0-9_]*)
+      | (?P<OPERATOR>[-+*/^()\[\]])
+      | (?P<NUMBER>[0-9]+(?:\.[0-9]*)?)
+      | (?P<NEWLINE>[;\n])
+      | (?P<COMPARISON>[=<>]=?)
+      | (?P<COMMA>,)
+      | (?P<STRING>"(?P<BODY>(?:[^"\\]|\\.)*)\\?(?P<CLOSE>"?))
+      | (?P<DOT>\.)
+      | (?P<COLON>:)
+      | (?P<NOT_EQUALS>!=?)
+      | (?P<ILLEGAL>[^ \t])
+    )
+""", re.VERBOSE | re.DOTALL)
+
+STRING_LITERAL = re.compile(r'"(?:[^"\\]|\\.)*\\?(?P<CLOSE>"?)', re.DOTALL)
+STRING_ESCAPE = re.compile(r'\\(.)', re.DOTALL)
+
+ESCAPE_CHARACTERS = {
+    'n': '\n',
+    't': '\t',
+    'b': '\b',
+    'r': '\r'
+}
+
+OPERATOR_KINDS = {char: TOKEN_KINDS[type_] for char, type_ in OPERATORS.items()}
+
+COMPARISONS = {
+    '=': KIND_EQ,
+    '==': KIND_ISEQ,
+    '<': KIND_LT,
+    '<=': KIND_LEQ,
+    '>': KIND_GT,
+    '>=': KIND_GEQ
+}
+
+SINGLE_CHARACTERS = {
+    ';': KIND_NEWLINE,
+    '\n': KIND_NEWLINE,
+    ',': KIND_COMMA,
+    ':': KIND_COLON
+}
+
+SINGLE_CHARACTER_KINDS = set(SINGLE_CHARACTERS.values())
+
+
+def unescape(escape):
+    return ESCAPE_CHARACTERS.get(escape[1], escape[1])
+
+
+# The Token for what RegexLex.scan yields. Like Lex, every token longer than
+# one character ends at the shared end position.
+def make_token(kind, value, start, stop, end, source):
+    token = Token(KIND_TYPES[kind], value)
+    token.pos_beg = Position(start, source)
+    if stop == end.index and kind not in SINGLE_CHARACTER_KINDS:
+        token.pos_end = end
+    else:
+        token.pos_end = token.pos_beg.following()
+    return token
+
+
+# Produces the same tokens and errors as Lex, a whole token per regex match.
+# Like Lex, every token longer than one character shares a single end
+# position, which is where lexing stops.
+class RegexLex:
+    def __init__(self, name, text):
+        self.name = name
+        self.text = text
+        self.source = Source(name, text)
+
+    def position(self, index):
+        return Position(index, self.source)
+
+    def end_position(self):
+        # Lexing stops at the end of the text, or one past it when the last
+        # string is never closed. Outside a string every quote opens one, so
+        # the strings can be found without lexing the rest.
+        last_string = None
+        if '"' in self.text:
+            for last_string in STRING_LITERAL.finditer(self.text):
+                pass
+        unclosed = last_string is not None and not last_string.group('CLOSE')
+        return self.position(len(self.text) + unclosed)
+
+    def create_tokens(self):
+        try:
+            return list(self.generate_tokens()), None
+        except Error as error:
+            return [], error
+
+    # Returns the tokens as a TokenBuffer, or the first error.
+    def create_buffer(self):
+        end = self.end_position()
+        buffer = TokenBuffer(self.source, end)
+        try:
+            buffer.extend(self.scan(end))
+        except Error as error:
+            return None, error
+        return buffer, None
+
+    # Yields the tokens one at a time and raises the first error.
+    def generate_tokens(self):
+        source = self.source
+        end = self.end_position()
+
+        for kind, value, start, stop in self.scan(end):
+            if kind == KIND_ERROR:
+                yield None, value
+            else:
+                yield make_token(kind, value, start, stop, end, source)
+
+    # Yields the kind, value, start and end offset of each token, and raises
+    # the first error. Tokens of one character end right after it, all
+    # others at end.
+    def scan(self, end):
+        text = self.text
+        stop = end.index
+
+        for found in TOKEN_PATTERN.finditer(text):
+            group = found.lastgroup
+            index = found.start(group)
+
+            if group == 'ID':
+                value = found.group(group)
+                yield KEYWORD_KINDS.get(value, KIND_ID), value, index, stop
+            elif group == 'OPERATOR':
+                yield OPERATOR_KINDS[text[index]], None, index, stop
+            elif group == 'NUMBER':
+                value = found.group(group)
+                if '.' in value:
+                    yield KIND_FLOAT, float(value), index, stop
+                else:
+                    yield KIND_INT, int(value), index, stop
+            elif group == 'NEWLINE' or group == 'COMMA' or group == 'COLON':
+                yield SINGLE_CHARACTERS[text[index]], None, index, index + 1
+            elif group == 'COMPARISON':
+                yield COMPARISONS[found.group(group)], None, index, stop
+            elif group == 'STRING':
+                yield KIND_STR, STRING_ESCAPE.sub(unescape, found.group('BODY')), index, stop
+            elif group == 'DOT':
+                if text.startswith('[', index + 1):
+                    yield KIND_DOT, None, index, stop
+                else:
+                    error = ExpectedCharError(self.position(index), end, "'[' (after '.')")
+                    yield KIND_ERROR, error, index, stop
+            elif group == 'NOT_EQUALS':
+                if found.group(group) != '!=':
+                    # Lex skips the character after a lone '!' as well.
+                    raise ExpectedCharError(self.position(index), self.position(index + 2), "'=' (after '!')")
+                yield KIND_NEQ, None, index, stop
+            else:
+                raise IllegalCharError(self.position(index), self.position(index + 1), "'" + text[index] + "'")
+
+        yield KIND_EOF, None, stop, stop + 1
+
+
+# -------------- TOKEN BUFFER -----------------
+
+# The tokens of a whole text in four parallel arrays: the kind, an index
+# into constants for the value, and the start and end offsets. A Token is
+# only made for the ones the parser keeps or reports an error at.
+class TokenBuffer:
+    def __init__(self, source, end):
+        self.source = source
+        self.end = end
+        self.kinds = array('B')
+        self.values = array('I')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.constants = [None]
+        self.constant_indices = {}
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def extend(self, tokens):
+        constants = self.constants
+        constant_indices = self.constant_indices
+        add_kind = self.kinds.append
+        add_value = self.values.append
+        add_start = self.starts.append
+        add_end = self.ends.append
+
+        for kind, value, start, end in tokens:
+            if value is None:
+                add_value(0)
+            else:
+                # 1 and 1.0 are equal as keys, so the kind is part of the key.
+                value_index = constant_indices.get((kind, value))
+                if value_index is None:
+                    value_index = constant_indices[kind, value] = len(constants)
+                    constants.append(value)
+                add_value(value_index)
+            add_kind(kind)
+            add_start(start)
+            add_end(end)
+
+    def kind(self, index):
+        return self.kinds[index] if index < len(self.kinds) else None
+
+    def get(self, index):
+        if index >= len(self.kinds):
+            return None
+
+        kind = self.kinds[index]
+        value = self.constants[self.values[index]]
+        if kind == KIND_ERROR:
+            return None, value
+
+        return make_token(kind, value, self.starts[index], self.ends[index], self.end, self.source)
+
+    # The whole text is in the buffer already, so unlike a TokenStream there
+    # is nothing for the parser to hold on to or drain.
+    def hold(self, index):
+        pass
+
+    def release(self):
+        pass
+
+    def drain(self):
+        pass
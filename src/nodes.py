@@ -1,6 +1,10 @@
 # ---------------- NODES ---------------------
 
+# Programs hold one node per expression, so nodes keep their attributes in
+# slots rather than a dict. Function.captures keys weakly on function bodies.
 class ASTNode:
+    __slots__ = ('pos_beg', 'pos_end', '__weakref__')
+
     def __init__(self, pos_beg, pos_end):
         self.pos_beg = pos_beg
         self.pos_end = pos_end
@@ -10,6 +14,8 @@ class ASTNode:
 
 
 class NumberNode(ASTNode):
+    __slots__ = ('tok',)
+
     def __init__(self, tok):
         super().__init__(tok.pos_beg, tok.pos_end)
         self.tok = tok
@@ -19,6 +25,8 @@ class NumberNode(ASTNode):
 
 
 class StringNode(ASTNode):
+    __slots__ = ('tok',)
+
     def __init__(self, tok):
         super().__init__(tok.pos_beg, tok.pos_end)
         self.tok = tok
@@ -28,63 +36,87 @@ class StringNode(ASTNode):
 
 
 class VarAccessNode(ASTNode):
+    __slots__ = ('var_name_token', 'specialized', 'slot')
+
     def __init__(self, var_name_token):
         super().__init__(var_name_token.pos_beg, var_name_token.pos_end)
         self.var_name_token = var_name_token
+        self.specialized = None
+        self.slot = None
 
     def __repr__(self):
         return f"{self.var_name_token}"
 
 
 class VarAssignNode(ASTNode):
+    __slots__ = ('var_name_token', 'value_node', 'slot')
+
     def __init__(self, var_name_token, value_node):
         super().__init__(var_name_token.pos_beg, value_node.pos_end)
         self.var_name_token = var_name_token
         self.value_node = value_node
+        self.slot = None
 
     def __repr__(self):
         return f"(VarAssignNode: {self.var_name_token} = {self.value_node})"
 
 
 class BinOpNode(ASTNode):
+    __slots__ = ('left_node', 'operator_token', 'right_node', 'specialized', 'numeric')
+
     def __init__(self, left_node, operator_token, right_node):
         super().__init__(left_node.pos_beg, right_node.pos_end)
         self.left_node = left_node
         self.operator_token = operator_token
         self.right_node = right_node
+        self.specialized = None
+        self.numeric = False
 
     def __repr__(self):
         return f"({self.left_node} {self.operator_token} {self.right_node})"
 
 
 class UnaryOpNode(ASTNode):
+    __slots__ = ('operator_token', 'node', 'numeric')
+
     def __init__(self, operator_token, node):
         super().__init__(operator_token.pos_beg, node.pos_end)
         self.operator_token = operator_token
         self.node = node
+        self.numeric = False
 
     def __repr__(self):
         return f"({self.operator_token}{self.node})"
 
 
 class IfNode(ASTNode):
+    __slots__ = ('cases', 'else_case', 'taken')
+
     def __init__(self, cases, else_case):
         self.cases = cases
         self.else_case = else_case
+        self.taken = None
 
         super().__init__(self.cases[0][0].pos_beg, (self.else_case or self.cases[len(self.cases) - 1])[0].pos_end)
 
 
 class WhileNode(ASTNode):
+    __slots__ = ('condition_node', 'body_node', 'null_check', 'generation', 'value_used')
+
     def __init__(self, condition_node, body_node, null_check):
         self.condition_node = condition_node
         self.body_node = body_node
         self.null_check = null_check
+        self.generation = 0
+        self.value_used = True
 
         super().__init__(self.condition_node.pos_beg, self.body_node.pos_end)
 
 
 class ForNode(ASTNode):
+    __slots__ = ('var_name_token', 'start_value_node', 'end_value_node', 'step_value_node', 'body_node',
+                 'null_check', 'generation', 'value_used')
+
     def __init__(self, var_name_token, start_value_node, end_value_node, step_value_node, body_node, null_check):
         self.var_name_token = var_name_token
         self.start_value_node = start_value_node
@@ -92,16 +124,22 @@ class ForNode(ASTNode):
         self.step_value_node = step_value_node
         self.body_node = body_node
         self.null_check = null_check
+        self.generation = 0
+        self.value_used = True
 
         super().__init__(self.var_name_token.pos_beg, self.body_node.pos_end)
 
 
 class FuncDefNode(ASTNode):
+    __slots__ = ('var_name_token', 'arg_name_tokens', 'body_node', 'null_check', 'layout')
+
     def __init__(self, var_name_token, arg_name_tokens, body_node, null_check):
         self.var_name_token = var_name_token
         self.arg_name_tokens = arg_name_tokens
         self.body_node = body_node
         self.null_check = null_check
+        self.layout = None
+        mark_tail_calls(self.body_node, self.null_check)
 
         if self.var_name_token:
             super().__init__(self.var_name_token.pos_beg, self.body_node.pos_end)
@@ -112,9 +150,14 @@ class FuncDefNode(ASTNode):
 
 
 class CallNode(ASTNode):
+    __slots__ = ('node_to_call', 'arg_nodes', 'checked_callee', 'tail_call', 'tail_null_check')
+
     def __init__(self, node_to_call, arg_nodes):
         self.node_to_call = node_to_call
         self.arg_nodes = arg_nodes
+        self.checked_callee = None
+        self.tail_call = False
+        self.tail_null_check = False
 
         if len(self.arg_nodes) > 0:
             super().__init__(self.node_to_call.pos_beg, self.arg_nodes[len(self.arg_nodes) - 1].pos_end)
@@ -123,7 +166,174 @@ class CallNode(ASTNode):
 
 
 class ListNode(ASTNode):
+    __slots__ = ('element_nodes', 'value_used')
+
     def __init__(self, element_nodes, pos_beg, pos_end):
         self.element_nodes = element_nodes
+        self.value_used = True
+
+        super().__init__(pos_beg, pos_end)
 
+
+class ConstNode(ASTNode):
+    __slots__ = ('value',)
+
+    def __init__(self, value, pos_beg, pos_end):
         super().__init__(pos_beg, pos_end)
+        self.value = value
+
+    def __repr__(self):
+        return f"CONST:{self.value!r}"
+
+
+class InvariantNode(ASTNode):
+    __slots__ = ('node', 'loop_node', 'cache_context', 'cache_generation', 'cache_value')
+
+    def __init__(self, node, loop_node):
+        super().__init__(node.pos_beg, node.pos_end)
+        self.node = node
+        self.loop_node = loop_node
+        self.cache_context = None
+        self.cache_generation = -1
+        self.cache_value = None
+
+    def cached(self, context):
+        if self.cache_context is context and self.cache_generation == self.loop_node.generation:
+            return self.cache_value
+        return None
+
+    def remember(self, context, value):
+        self.cache_context = context
+        self.cache_generation = self.loop_node.generation
+        self.cache_value = value
+
+
+def iter_child_nodes(node):
+    if isinstance(node, VarAssignNode):
+        yield node.value_node
+    elif isinstance(node, BinOpNode):
+        yield node.left_node
+        yield node.right_node
+    elif isinstance(node, UnaryOpNode):
+        yield node.node
+    elif isinstance(node, IfNode):
+        for condition, expr, _ in node.cases:
+            yield condition
+            yield expr
+        if node.else_case:
+            yield node.else_case[0]
+    elif isinstance(node, WhileNode):
+        yield node.condition_node
+        yield node.body_node
+    elif isinstance(node, ForNode):
+        yield node.start_value_node
+        yield node.end_value_node
+        if node.step_value_node:
+            yield node.step_value_node
+        yield node.body_node
+    elif isinstance(node, FuncDefNode):
+        yield node.body_node
+    elif isinstance(node, CallNode):
+        yield node.node_to_call
+        yield from node.arg_nodes
+    elif isinstance(node, ListNode):
+        yield from node.element_nodes
+    elif isinstance(node, InvariantNode):
+        yield node.node
+
+
+def walk(node):
+    todo = [node]
+    while todo:
+        node = todo.pop()
+        todo.extend(iter_child_nodes(node))
+        yield node
+
+
+def dump_tree(node, indent=0):
+    pad = '  ' * indent
+    if isinstance(node, (NumberNode, StringNode)):
+        return f"{pad}{node.tok.type}:{node.tok.value!r}"
+    if isinstance(node, (VarAccessNode, ConstNode)):
+        return f"{pad}{node!r}"
+
+    if isinstance(node, VarAssignNode):
+        header = f"{pad}VarAssignNode {node.var_name_token.value}"
+    elif isinstance(node, (BinOpNode, UnaryOpNode)):
+        header = f"{pad}{type(node).__name__} {node.operator_token}"
+    elif isinstance(node, ForNode):
+        header = f"{pad}ForNode {node.var_name_token.value}"
+    elif isinstance(node, FuncDefNode):
+        args = ', '.join(arg_name.value for arg_name in node.arg_name_tokens)
+        header = f"{pad}FuncDefNode {node.var_name_token.value if node.var_name_token else '<anonymous>'}({args})"
+    else:
+        header = f"{pad}{type(node).__name__}"
+
+    return '\n'.join([header] + [dump_tree(child, indent + 1) for child in iter_child_nodes(node)])
+
+
+# Marks the calls whose value becomes the value of the enclosing function,
+# so the interpreter can run them in place of the frame that makes them.
+def mark_tail_calls(node, null_check=False):
+    if isinstance(node, CallNode):
+        node.tail_call = True
+        node.tail_null_check = null_check
+    elif isinstance(node, IfNode):
+        for _, expr, case_null_check in node.cases:
+            mark_tail_calls(expr, null_check or case_null_check)
+        if node.else_case:
+            expr, case_null_check = node.else_case
+            mark_tail_calls(expr, null_check or case_null_check)
+    elif isinstance(node, ListNode) and null_check and node.element_nodes:
+        mark_tail_calls(node.element_nodes[-1], null_check)
+
+
+# The names a function body reads and the names it calls, or None when it
+# calls something that isn't a plain name or calls an argument. Nested
+# functions count as part of the body, so their reads are included.
+def free_names(body_node, arg_names):
+    names = set()
+    callees = set()
+    for node in walk(body_node):
+        if isinstance(node, CallNode):
+            if not isinstance(node.node_to_call, VarAccessNode):
+                return None
+            callees.add(node.node_to_call.var_name_token.value)
+        elif isinstance(node, VarAccessNode):
+            names.add(node.var_name_token.value)
+
+    if callees.intersection(arg_names):
+        return None
+    names.difference_update(arg_names)
+    return tuple(names), tuple(callees)
+
+
+# Clears value_used on the loops and lists whose value is thrown away: the
+# statements of block bodies, and anything inside a discarded value. Their
+# elements still run, only the result List is never built.
+def mark_unused_values(node, used=True):
+    pending = [(node, used)]
+    while pending:
+        node, used = pending.pop()
+        if isinstance(node, (WhileNode, ForNode, ListNode)):
+            node.value_used = used
+
+        if isinstance(node, ListNode):
+            pending.extend((element_node, used) for element_node in node.element_nodes)
+        elif isinstance(node, IfNode):
+            for condition, expr, null_check in node.cases:
+                pending.append((condition, True))
+                pending.append((expr, used and not null_check))
+            if node.else_case:
+                expr, null_check = node.else_case
+                pending.append((expr, used and not null_check))
+        elif isinstance(node, WhileNode):
+            pending.append((node.condition_node, True))
+            pending.append((node.body_node, used and not node.null_check))
+        elif isinstance(node, ForNode):
+            pending.extend((child, True) for child in iter_child_nodes(node) if child is not node.body_node)
+            pending.append((node.body_node, used and not node.null_check))
+        elif isinstance(node, FuncDefNode):
+            pending.append((node.body_node, not node.null_check))
+        else:
+            pending.extend((child, True) for child in iter_child_nodes(node))
@@ -0,0 +1,289 @@
+from .interpreter import *
+from .bytecode import operator_method_name
+from .inference import TypeInference
+
+FOLD_SIZE_LIMIT = 4096
+
+BUILTIN_CONSTANTS = {
+    'NULL': Number.null,
+    'TRUE': Number.true,
+    'FALSE': Number.false
+}
+
+
+# --------------- OPTIMIZER -----------------
+
+class Optimizer:
+    def __init__(self, symbol_table=None):
+        self.symbol_table = symbol_table
+        # Every name a program run against the table has bound, so that a
+        # builtin constant shadowed by an earlier REPL line is never folded.
+        # A program run later can still bind one, and what was folded before
+        # that keeps the builtin's value.
+        self.bound_names = bound_names(symbol_table).names if symbol_table is not None else set()
+        self.folded = 0
+        self.pooled = 0
+        self.pruned = 0
+        self.hoisted = 0
+
+    def optimize(self, node):
+        if self.symbol_table is not None:
+            bound_names(self.symbol_table).add(node)
+
+        node = self.visit(node)
+        self.hoist_loops(node)
+        node = self.pool(node, False)
+        TypeInference(self.symbol_table).annotate(node)
+        return node
+
+    # ------------ folding -------------
+
+    def visit(self, node):
+        method = getattr(self, f'visit_{type(node).__name__}', None)
+        if method:
+            return method(node)
+        self.visit_children(node)
+        return node
+
+    def visit_children(self, node):
+        if isinstance(node, VarAssignNode):
+            node.value_node = self.visit(node.value_node)
+        elif isinstance(node, WhileNode):
+            node.condition_node = self.visit(node.condition_node)
+            node.body_node = self.visit(node.body_node)
+        elif isinstance(node, ForNode):
+            node.start_value_node = self.visit(node.start_value_node)
+            node.end_value_node = self.visit(node.end_value_node)
+            if node.step_value_node:
+                node.step_value_node = self.visit(node.step_value_node)
+            node.body_node = self.visit(node.body_node)
+        elif isinstance(node, FuncDefNode):
+            node.body_node = self.visit(node.body_node)
+        elif isinstance(node, CallNode):
+            node.node_to_call = self.visit(node.node_to_call)
+            node.arg_nodes = [self.visit(arg_node) for arg_node in node.arg_nodes]
+        elif isinstance(node, ListNode):
+            node.element_nodes = [self.visit(element_node) for element_node in node.element_nodes]
+
+    @staticmethod
+    def literal_value(node):
+        if isinstance(node, NumberNode):
+            return Number(node.tok.value)
+        if isinstance(node, StringNode):
+            return String(node.tok.value)
+        if isinstance(node, ConstNode):
+            return node.value.copy()
+        return None
+
+    def literal_node(self, value, node):
+        if isinstance(value, String):
+            if len(value.value) > FOLD_SIZE_LIMIT:
+                return node
+            tok = Token(TOK_STR, value.value, node.pos_beg, node.pos_end)
+            literal = StringNode(tok)
+        elif type(value) is Number and isinstance(value.value, (int, float)):
+            if isinstance(value.value, int) and value.value.bit_length() > FOLD_SIZE_LIMIT:
+                return node
+            tok = Token(TOK_INT if isinstance(value.value, int) else TOK_FLOAT, value.value, node.pos_beg, node.pos_end)
+            literal = NumberNode(tok)
+        else:
+            return node
+
+        literal.pos_beg, literal.pos_end = node.pos_beg, node.pos_end
+        self.folded += 1
+        return literal
+
+    @staticmethod
+    def too_expensive(method_name, left, right):
+        if method_name == 'exponentiate' and isinstance(left.value, int) and isinstance(right.value, int):
+            return right.value * max(abs(left.value).bit_length(), 1) > FOLD_SIZE_LIMIT
+        if method_name == 'multiply' and isinstance(left, String) != isinstance(right, String):
+            text, count = (left, right) if isinstance(left, String) else (right, left)
+            return not isinstance(count.value, int) or len(text.value) * abs(count.value) > FOLD_SIZE_LIMIT
+        return False
+
+    def visit_VarAccessNode(self, node):
+        var_name = node.var_name_token.value
+        value = BUILTIN_CONSTANTS.get(var_name)
+        if value is None or self.symbol_table is None or var_name in self.bound_names or \
+                self.symbol_table.symbols.get(var_name) is not value:
+            return node
+        return self.literal_node(value, node)
+
+    def visit_BinOpNode(self, node):
+        node.left_node = self.visit(node.left_node)
+        node.right_node = self.visit(node.right_node)
+
+        left = self.literal_value(node.left_node)
+        right = self.literal_value(node.right_node)
+        if left is None or right is None or node.operator_token.type == TOK_DOT:
+            return node
+
+        method_name = operator_method_name(node.operator_token)
+        if self.too_expensive(method_name, left, right):
+            return node
+
+        try:
+            result, error = getattr(left, method_name)(right)
+        except (ArithmeticError, TypeError, ValueError):
+            return node
+        if error:
+            return node
+        return self.literal_node(result, node)
+
+    def visit_UnaryOpNode(self, node):
+        node.node = self.visit(node.node)
+
+        operand = self.literal_value(node.node)
+        if operand is None:
+            return node
+
+        if node.operator_token.type == TOK_MINUS:
+            result, error = operand.multiply(Number(-1))
+        elif node.operator_token.is_match(TOK_KEYWORD, 'NOT'):
+            if not isinstance(operand, Number):
+                return node
+            result, error = operand.logical_not()
+        else:
+            result, error = operand, None
+
+        if error:
+            return node
+        return self.literal_node(result, node)
+
+    def visit_IfNode(self, node):
+        cases = []
+        else_case = node.else_case
+
+        for index, (condition, expr, null_check) in enumerate(node.cases):
+            condition = self.visit(condition)
+            expr = self.visit(expr)
+            value = self.literal_value(condition)
+
+            if value is None:
+                cases.append((condition, expr, null_check))
+            elif value.is_true():
+                self.pruned += len(node.cases) - index - 1 + (1 if node.else_case else 0)
+                else_case = (expr, null_check)
+                break
+            else:
+                self.pruned += 1
+        else:
+            if else_case:
+                else_case = (self.visit(else_case[0]), else_case[1])
+
+        if cases:
+            node.cases = cases
+            node.else_case = else_case
+            return node
+
+        if else_case:
+            expr, null_check = else_case
+            if not null_check:
+                return expr
+            node.cases = [(self.truth_node(node, 1), expr, True)]
+        else:
+            node.cases = [(self.truth_node(node, 0), self.truth_node(node, 0), False)]
+        node.else_case = None
+        return node
+
+    @staticmethod
+    def truth_node(node, value):
+        return NumberNode(Token(TOK_INT, value, node.pos_beg, node.pos_end))
+
+    # ------------ hoisting -------------
+
+    def hoist_loops(self, node):
+        if isinstance(node, (WhileNode, ForNode)):
+            assigned = self.assigned_names(node)
+            if isinstance(node, WhileNode):
+                node.condition_node = self.hoist(node.condition_node, True, node, assigned)
+            node.body_node = self.hoist(node.body_node, False, node, assigned)
+
+        for child in iter_child_nodes(node):
+            self.hoist_loops(child)
+
+    @staticmethod
+    def assigned_names(loop_node):
+        names = set()
+        for node in walk(loop_node):
+            if isinstance(node, (VarAssignNode, ForNode)):
+                names.add(node.var_name_token.value)
+            elif isinstance(node, FuncDefNode) and node.var_name_token:
+                names.add(node.var_name_token.value)
+        return names
+
+    def is_invariant(self, node, assigned):
+        if isinstance(node, (NumberNode, StringNode, ConstNode)):
+            return True
+        if isinstance(node, VarAccessNode):
+            return node.var_name_token.value not in assigned
+        if isinstance(node, BinOpNode):
+            return node.operator_token.type != TOK_DOT and \
+                self.is_invariant(node.left_node, assigned) and self.is_invariant(node.right_node, assigned)
+        if isinstance(node, UnaryOpNode):
+            return self.is_invariant(node.node, assigned)
+        return False
+
+    def hoist(self, node, safe, loop_node, assigned):
+        # A called function binds names in its own frame, so calls in the loop
+        # cannot rebind anything the loop reads; they can only mutate lists,
+        # whose results are never cached.
+        if isinstance(node, (FuncDefNode, InvariantNode)):
+            return node
+        if safe and isinstance(node, (BinOpNode, UnaryOpNode)) and self.is_invariant(node, assigned):
+            self.hoisted += 1
+            return InvariantNode(node, loop_node)
+
+        self.rewrite_children(node, lambda child, child_safe: self.hoist(child, child_safe, loop_node, assigned))
+        return node
+
+    # ------------ pooling -------------
+
+    def pool(self, node, safe):
+        if safe and isinstance(node, NumberNode):
+            self.pooled += 1
+            return ConstNode(Number(node.tok.value).set_pos(node.pos_beg, node.pos_end), node.pos_beg, node.pos_end)
+        if safe and isinstance(node, StringNode):
+            self.pooled += 1
+            return ConstNode(String(node.tok.value).set_pos(node.pos_beg, node.pos_end), node.pos_beg, node.pos_end)
+
+        self.rewrite_children(node, self.pool)
+        return node
+
+    # Rewrites every child through rewrite(child, safe), where safe means the
+    # child's value is only consumed by an operator or a truth test and so may
+    # be a shared object.
+    @staticmethod
+    def rewrite_children(node, rewrite):
+        if isinstance(node, BinOpNode):
+            operand_safe = node.operator_token.type != TOK_DOT
+            node.left_node = rewrite(node.left_node, operand_safe)
+            node.right_node = rewrite(node.right_node, operand_safe)
+        elif isinstance(node, UnaryOpNode):
+            node.node = rewrite(node.node, node.operator_token.type != TOK_PLUS)
+        elif isinstance(node, IfNode):
+            node.cases = [(rewrite(condition, True), rewrite(expr, False), null_check)
+                          for condition, expr, null_check in node.cases]
+            if node.else_case:
+                node.else_case = (rewrite(node.else_case[0], False), node.else_case[1])
+        elif isinstance(node, WhileNode):
+            node.condition_node = rewrite(node.condition_node, True)
+            node.body_node = rewrite(node.body_node, False)
+        elif isinstance(node, ForNode):
+            node.start_value_node = rewrite(node.start_value_node, True)
+            node.end_value_node = rewrite(node.end_value_node, True)
+            if node.step_value_node:
+                node.step_value_node = rewrite(node.step_value_node, True)
+            node.body_node = rewrite(node.body_node, False)
+        elif isinstance(node, VarAssignNode):
+            node.value_node = rewrite(node.value_node, False)
+        elif isinstance(node, FuncDefNode):
+            node.body_node = rewrite(node.body_node, False)
+        elif isinstance(node, CallNode):
+            node.node_to_call = rewrite(node.node_to_call, False)
+            node.arg_nodes = [rewrite(arg_node, False) for arg_node in node.arg_nodes]
+        elif isinstance(node, ListNode):
+            node.element_nodes = [rewrite(element_node, False) for element_node in node.element_nodes]
+        elif isinstance(node, InvariantNode):
+            node.node = rewrite(node.node, False)
@@ -1,7 +1,27 @@
+import sys
+from contextlib import contextmanager
+
 from .nodes import *
 from .lexer import *
 from .error import *
 
+# The recursive descent below takes about a dozen Python frames for each
+# level of nesting in the source.
+FRAMES_PER_NESTING = 16
+
+
+# Room on the Python stack for max_nesting more levels, for as long as the
+# block runs. The passes after parsing recurse over the tree as well.
+@contextmanager
+def nesting_room(max_nesting):
+    recursion_limit = sys.getrecursionlimit()
+    if max_nesting is not None:
+        sys.setrecursionlimit(recursion_limit + max_nesting * FRAMES_PER_NESTING)
+    try:
+        yield
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+
 
 # -------------------- PARSE RESULT -------------------------
 
@@ -40,32 +60,117 @@ class ParseResult:
         return self
 
 
+# ------------- TOKEN STREAM ----------------
+
+# Reads tokens from an iterator as the parser asks for them. Only the tokens
+# from the oldest hold onward are buffered, since that's as far back as the
+# parser can reverse.
+class TokenStream:
+    def __init__(self, tokens):
+        self.tokens = iter(tokens)
+        self.buffer = []
+        self.offset = 0
+        self.holds = []
+
+    def get(self, index):
+        while index - self.offset >= len(self.buffer):
+            token = next(self.tokens, None)
+            if token is None:
+                return None
+            self.buffer.append(token)
+
+        keep = min(self.holds[0], index) if self.holds else index
+        if keep > self.offset:
+            del self.buffer[:keep - self.offset]
+            self.offset = keep
+        return self.buffer[index - self.offset] if index >= self.offset else None
+
+    def kind(self, index):
+        token = self.get(index)
+        return None if token is None else token_kind(token)
+
+    def hold(self, index):
+        self.holds.append(index)
+
+    def release(self):
+        self.holds.pop()
+
+    # Reads the tokens nobody asked for, so a lexing error in them is still
+    # raised.
+    def drain(self):
+        for _ in self.tokens:
+            pass
+
+
 # --------------- PARSER -------------------
 
+# Reads a TokenBuffer in place, or any other iterable of Tokens through a
+# TokenStream. Either way it looks at the kind of the current token, and
+# only asks for the Token itself when a node or an error needs it.
+#
+# Without a max_nesting, input parses as deep as the Python stack allows.
+# With one, the parser makes room on the stack for that many levels of
+# nesting and rejects anything deeper.
 class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
+    def __init__(self, tokens, max_nesting=None):
+        self.tokens = tokens if isinstance(tokens, TokenBuffer) else TokenStream(tokens)
         self.tok_index = -1
-        self.current_tok = None
-        self.advance()
+        self.current_index = -1
+        self.current_kind = None
+        self.token = None
+        self.max_nesting = max_nesting
+        self.nesting = 0
 
     def advance(self):
         self.tok_index += 1
         self.update_current_tok()
-        return self.current_tok
 
     def reverse(self, amount=1):
         self.tok_index -= amount
         self.update_current_tok()
-        return self.current_tok
 
     def update_current_tok(self):
-        if 0 <= self.tok_index < len(self.tokens):
-            self.current_tok = self.tokens[self.tok_index]
+        if self.tok_index >= 0:
+            kind = self.tokens.kind(self.tok_index)
+            # A lexer leaves some errors in place of a token; they count
+            # once the parser gets to them.
+            if kind == KIND_ERROR:
+                raise self.tokens.get(self.tok_index)[1]
+            if kind is not None:
+                self.current_index = self.tok_index
+                self.current_kind = kind
+                self.token = None
+
+    @property
+    def current_tok(self):
+        if self.token is None:
+            self.token = self.tokens.get(self.current_index)
+        return self.token
 
     def parse(self):
-        res = self.statements()
-        if not res.error and self.current_tok.type != TOK_EOF:
+        # Lexing errors come out of the token stream as exceptions, and are
+        # reported ahead of any syntax error, as if the whole text had been
+        # lexed first.
+        try:
+            self.advance()
+            res = self.parse_statements()
+            if res.error:
+                self.tokens.drain()
+        except Error as error:
+            return ParseResult().failure(error)
+        return res
+
+    def parse_statements(self):
+        # Nesting maps onto Python recursion here; report it as a syntax
+        # error rather than letting it take down the host.
+        try:
+            with nesting_room(self.max_nesting):
+                res = self.statements()
+        except RecursionError:
+            return ParseResult().failure(self.nested_too_deeply())
+        except InvalidSyntaxError as error:
+            return ParseResult().failure(error)
+        if not res.error and self.current_kind != KIND_EOF:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_beg,
                 self.current_tok.pos_end,
@@ -77,7 +182,7 @@ class Parser:
         statements = []
         pos_beg = self.current_tok.pos_beg.copy()
 
-        while self.current_tok.type == TOK_NEWLINE:
+        while self.current_kind == KIND_NEWLINE:
             res.register_advancement()
             self.advance()
 
@@ -90,7 +195,7 @@ class Parser:
 
         while True:
             newline_cnt = 0
-            while self.current_tok.type == TOK_NEWLINE:
+            while self.current_kind == KIND_NEWLINE:
                 res.register_advancement()
                 self.advance()
                 newline_cnt += 1
@@ -99,7 +204,9 @@ class Parser:
 
             if not more_statements:
                 break
+            self.tokens.hold(self.tok_index)
             statement = res.try_register(self.expr())
+            self.tokens.release()
             if not statement:
                 self.reverse(res.to_reverse_cnt)
                 more_statements = False
@@ -112,14 +219,31 @@ class Parser:
             self.current_tok.pos_end.copy()
         ))
 
+    def nested_too_deeply(self):
+        return InvalidSyntaxError(
+            self.current_tok.pos_beg,
+            self.current_tok.pos_end,
+            "Expression is nested too deeply")
+
+    # Every level of nesting goes through here. Going past max_nesting raises
+    # rather than returning the error, so that no caller can take it for a
+    # statement that just isn't there.
     def expr(self):
+        if self.nesting == self.max_nesting:
+            raise self.nested_too_deeply()
+        self.nesting += 1
+        res = self.assign_expr()
+        self.nesting -= 1
+        return res
+
+    def assign_expr(self):
         res = ParseResult()
 
-        if self.current_tok.is_match(TOK_KEYWORD, 'VAR'):
+        if self.current_kind == KIND_VAR:
             res.register_advancement()
             self.advance()
 
-            if self.current_tok.type != TOK_ID:
+            if self.current_kind != KIND_ID:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_beg,
                     self.current_tok.pos_end,
@@ -129,7 +253,7 @@ class Parser:
             res.register_advancement()
             self.advance()
 
-            if self.current_tok.type != TOK_EQ:
+            if self.current_kind != KIND_EQ:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_beg,
                     self.current_tok.pos_end,
@@ -144,7 +268,7 @@ class Parser:
 
             return res.success(VarAssignNode(var_name, expr))
 
-        node = res.register(self.bin_op(self.comp_expr, ((TOK_KEYWORD, "AND"), (TOK_KEYWORD, "OR"))))
+        node = res.register(self.bin_op(self.comp_expr, (KIND_AND, KIND_OR)))
 
         if res.error:
             return res.failure(InvalidSyntaxError(
@@ -157,7 +281,7 @@ class Parser:
     def comp_expr(self):
         res = ParseResult()
 
-        if self.current_tok.is_match(TOK_KEYWORD, 'NOT'):
+        if self.current_kind == KIND_NOT:
             operator_token = self.current_tok
             res.register_advancement()
             self.advance()
@@ -168,7 +292,7 @@ class Parser:
 
             return res.success(UnaryOpNode(operator_token, node))
 
-        node = res.register(self.bin_op(self.arith_expr, (TOK_ISEQ, TOK_NEQ, TOK_LT, TOK_GT, TOK_LEQ, TOK_GEQ)))
+        node = res.register(self.bin_op(self.arith_expr, (KIND_ISEQ, KIND_NEQ, KIND_LT, KIND_GT, KIND_LEQ, KIND_GEQ)))
 
         if res.error:
             return res.failure(InvalidSyntaxError(
@@ -180,16 +304,16 @@ class Parser:
         return res.success(node)
 
     def arith_expr(self):
-        return self.bin_op(self.term, (TOK_PLUS, TOK_MINUS, TOK_DOT))
+        return self.bin_op(self.term, (KIND_PLUS, KIND_MINUS, KIND_DOT))
 
     def term(self):
-        return self.bin_op(self.factor, (TOK_MULT, TOK_DIV, TOK_DOT))
+        return self.bin_op(self.factor, (KIND_MULT, KIND_DIV, KIND_DOT))
 
     def factor(self):
         res = ParseResult()
-        tok = self.current_tok
 
-        if tok.type in (TOK_PLUS, TOK_MINUS):
+        if self.current_kind in (KIND_PLUS, KIND_MINUS):
+            tok = self.current_tok
             res.register_advancement()
             self.advance()
             factor = res.register(self.factor())
@@ -200,7 +324,7 @@ class Parser:
         return self.power()
 
     def power(self):
-        return self.bin_op(self.call, (TOK_POW,), self.factor)
+        return self.bin_op(self.call, (KIND_POW,), self.factor)
 
     def call(self):
         res = ParseResult()
@@ -208,12 +332,12 @@ class Parser:
         if res.error:
             return res
 
-        if self.current_tok.type == TOK_LPAR:
+        if self.current_kind == KIND_LPAR:
             res.register_advancement()
             self.advance()
             arg_nodes = []
 
-            if self.current_tok.type == TOK_RPAR:
+            if self.current_kind == KIND_RPAR:
                 res.register_advancement()
                 self.advance()
             else:
@@ -225,7 +349,7 @@ class Parser:
                         "Expected ')', 'VAR', 'IF', 'FOR', 'WHILE', 'FUNC', int, float, identifier, '+', '-', "
                         "'(', '[' or 'NOT' "))
 
-                while self.current_tok.type == TOK_COMMA:
+                while self.current_kind == KIND_COMMA:
                     res.register_advancement()
                     self.advance()
 
@@ -233,7 +357,7 @@ class Parser:
                     if res.error:
                         return res
 
-                if self.current_tok.type != TOK_RPAR:
+                if self.current_kind != KIND_RPAR:
                     return res.failure(InvalidSyntaxError(
                         self.current_tok.pos_beg,
                         self.current_tok.pos_end,
@@ -246,30 +370,33 @@ class Parser:
 
     def atom(self):
         res = ParseResult()
-        tok = self.current_tok
+        kind = self.current_kind
 
-        if tok.type in (TOK_INT, TOK_FLOAT):
+        if kind == KIND_INT or kind == KIND_FLOAT:
+            tok = self.current_tok
             res.register_advancement()
             self.advance()
             return res.success(NumberNode(tok))
 
-        elif tok.type in TOK_STR:
+        elif kind == KIND_STR:
+            tok = self.current_tok
             res.register_advancement()
             self.advance()
             return res.success(StringNode(tok))
 
-        elif tok.type == TOK_ID:
+        elif kind == KIND_ID:
+            tok = self.current_tok
             res.register_advancement()
             self.advance()
             return res.success(VarAccessNode(tok))
 
-        elif tok.type == TOK_LPAR:
+        elif kind == KIND_LPAR:
             res.register_advancement()
             self.advance()
             expr = res.register(self.expr())
             if res.error:
                 return res
-            if self.current_tok.type == TOK_RPAR:
+            if self.current_kind == KIND_RPAR:
                 res.register_advancement()
                 self.advance()
                 return res.success(expr)
@@ -279,55 +406,55 @@ class Parser:
                     self.current_tok.pos_end,
                     "Expected ')'"))
 
-        elif tok.type == TOK_LSQUARE:
+        elif kind == KIND_LSQUARE:
             list_expr = res.register(self.list_expr())
             if res.error:
                 return res
             return res.success(list_expr)
 
-        elif tok.is_match(TOK_KEYWORD, 'IF'):
+        elif kind == KIND_IF:
             if_expr = res.register(self.if_expr())
             if res.error:
                 return res
             return res.success(if_expr)
 
-        elif tok.is_match(TOK_KEYWORD, 'FOR'):
+        elif kind == KIND_FOR:
             for_expr = res.register(self.for_expr())
             if res.error:
                 return res
             return res.success(for_expr)
 
-        elif tok.is_match(TOK_KEYWORD, 'WHILE'):
+        elif kind == KIND_WHILE:
             while_expr = res.register(self.while_expr())
             if res.error:
                 return res
             return res.success(while_expr)
 
-        elif tok.is_match(TOK_KEYWORD, 'FUNC'):
+        elif kind == KIND_FUNC:
             func_def = res.register(self.func_def())
             if res.error:
                 return res
             return res.success(func_def)
 
         return res.failure(InvalidSyntaxError(
-            tok.pos_beg,
-            tok.pos_end,
+            self.current_tok.pos_beg,
+            self.current_tok.pos_end,
             "Expected int, float, identifier, '+', '-', '(', '[', 'IF', 'FOR', 'WHILE', 'FUNC'"))
 
     def if_expr_elif_else_cases(self):
         res = ParseResult()
         cases, else_case = [], None
 
-        if self.current_tok.is_match(TOK_KEYWORD, 'ELIF'):
+        if self.current_kind == KIND_ELIF:
             all_cases = res.register(self.if_expr('ELIF'))
             if res.error:
                 return res
             cases, else_case = all_cases
-        elif self.current_tok.is_match(TOK_KEYWORD, 'ELSE'):
+        elif self.current_kind == KIND_ELSE:
             res.register_advancement()
             self.advance()
 
-            if self.current_tok.type == TOK_NEWLINE:
+            if self.current_kind == KIND_NEWLINE:
                 res.register_advancement()
                 self.advance()
 
@@ -336,7 +463,7 @@ class Parser:
                     return res
                 else_case = (statements, True)
 
-                if self.current_tok.is_match(TOK_KEYWORD, 'END'):
+                if self.current_kind == KIND_END:
                     res.register_advancement()
                     self.advance()
                 else:
@@ -357,7 +484,7 @@ class Parser:
         res = ParseResult()
         cases, else_case = [], None
 
-        if not self.current_tok.is_match(TOK_KEYWORD, case_keyword):
+        if self.current_kind != KEYWORD_KINDS[case_keyword]:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_beg, self.current_tok.pos_end,
                 f"Expected '{case_keyword}'"
@@ -370,7 +497,7 @@ class Parser:
         if res.error:
             return res
 
-        if not self.current_tok.is_match(TOK_KEYWORD, 'THEN'):
+        if self.current_kind != KIND_THEN:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_beg,
                 self.current_tok.pos_end,
@@ -380,7 +507,7 @@ class Parser:
         res.register_advancement()
         self.advance()
 
-        if self.current_tok.type == TOK_NEWLINE:
+        if self.current_kind == KIND_NEWLINE:
             res.register_advancement()
             self.advance()
 
@@ -389,7 +516,7 @@ class Parser:
                 return res
             cases.append((condition, statements, True))
 
-            if self.current_tok.is_match(TOK_KEYWORD, 'END'):
+            if self.current_kind == KIND_END:
                 res.register_advancement()
                 self.advance()
             else:
@@ -418,7 +545,7 @@ class Parser:
     def for_expr(self):
         res = ParseResult()
 
-        if not self.current_tok.is_match(TOK_KEYWORD, 'FOR'):
+        if self.current_kind != KIND_FOR:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_beg,
                 self.current_tok.pos_end,
@@ -427,7 +554,7 @@ class Parser:
         res.register_advancement()
         self.advance()
 
-        if self.current_tok.type != TOK_ID:
+        if self.current_kind != KIND_ID:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_beg,
                 self.current_tok.pos_end,
@@ -437,7 +564,7 @@ class Parser:
         res.register_advancement()
         self.advance()
 
-        if self.current_tok.type != TOK_EQ:
+        if self.current_kind != KIND_EQ:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_beg,
                 self.current_tok.pos_end,
@@ -450,7 +577,7 @@ class Parser:
         if res.error:
             return res
 
-        if not self.current_tok.is_match(TOK_KEYWORD, 'TO'):
+        if self.current_kind != KIND_TO:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_beg,
                 self.current_tok.pos_end,
@@ -463,7 +590,7 @@ class Parser:
         if res.error:
             return res
 
-        if self.current_tok.is_match(TOK_KEYWORD, 'STEP'):
+        if self.current_kind == KIND_STEP:
             res.register_advancement()
             self.advance()
 
@@ -473,7 +600,7 @@ class Parser:
         else:
             step_value = None
 
-        if not self.current_tok.is_match(TOK_KEYWORD, 'THEN'):
+        if self.current_kind != KIND_THEN:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_beg,
                 self.current_tok.pos_end,
@@ -482,7 +609,7 @@ class Parser:
         res.register_advancement()
         self.advance()
 
-        if self.current_tok.type == TOK_NEWLINE:
+        if self.current_kind == KIND_NEWLINE:
             res.register_advancement()
             self.advance()
 
@@ -490,7 +617,7 @@ class Parser:
             if res.error:
                 return res
 
-            if not self.current_tok.is_match(TOK_KEYWORD, 'END'):
+            if self.current_kind != KIND_END:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_beg,
                     self.current_tok.pos_end,
@@ -511,7 +638,7 @@ class Parser:
     def while_expr(self):
         res = ParseResult()
 
-        if not self.current_tok.is_match(TOK_KEYWORD, 'WHILE'):
+        if self.current_kind != KIND_WHILE:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_beg,
                 self.current_tok.pos_end,
@@ -524,7 +651,7 @@ class Parser:
         if res.error:
             return res
 
-        if not self.current_tok.is_match(TOK_KEYWORD, 'THEN'):
+        if self.current_kind != KIND_THEN:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_beg,
                 self.current_tok.pos_end,
@@ -533,7 +660,7 @@ class Parser:
         res.register_advancement()
         self.advance()
 
-        if self.current_tok.type == TOK_NEWLINE:
+        if self.current_kind == KIND_NEWLINE:
             res.register_advancement()
             self.advance()
 
@@ -541,7 +668,7 @@ class Parser:
             if res.error:
                 return res
 
-            if not self.current_tok.is_match(TOK_KEYWORD, 'END'):
+            if self.current_kind != KIND_END:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_beg,
                     self.current_tok.pos_end,
@@ -562,7 +689,7 @@ class Parser:
     def func_def(self):
         res = ParseResult()
 
-        if not self.current_tok.is_match(TOK_KEYWORD, 'FUNC'):
+        if self.current_kind != KIND_FUNC:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_beg,
                 self.current_tok.pos_end,
@@ -571,18 +698,18 @@ class Parser:
         res.register_advancement()
         self.advance()
 
-        if self.current_tok.type == TOK_ID:
+        if self.current_kind == KIND_ID:
             var_name_token = self.current_tok
             res.register_advancement()
             self.advance()
-            if self.current_tok.type != TOK_LPAR:
+            if self.current_kind != KIND_LPAR:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_beg,
                     self.current_tok.pos_end,
                     f"Expected '('"))
         else:
             var_name_token = None
-            if self.current_tok.type != TOK_LPAR:
+            if self.current_kind != KIND_LPAR:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_beg,
                     self.current_tok.pos_end,
@@ -592,16 +719,16 @@ class Parser:
         self.advance()
         arg_name_tokens = []
 
-        if self.current_tok.type == TOK_ID:
+        if self.current_kind == KIND_ID:
             arg_name_tokens.append(self.current_tok)
             res.register_advancement()
             self.advance()
 
-            while self.current_tok.type == TOK_COMMA:
+            while self.current_kind == KIND_COMMA:
                 res.register_advancement()
                 self.advance()
 
-                if self.current_tok.type != TOK_ID:
+                if self.current_kind != KIND_ID:
                     return res.failure(InvalidSyntaxError(
                         self.current_tok.pos_beg,
                         self.current_tok.pos_end,
@@ -611,13 +738,13 @@ class Parser:
                 res.register_advancement()
                 self.advance()
 
-            if self.current_tok.type != TOK_RPAR:
+            if self.current_kind != KIND_RPAR:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_beg,
                     self.current_tok.pos_end,
                     f"Expected ',' or ')'"))
         else:
-            if self.current_tok.type != TOK_RPAR:
+            if self.current_kind != KIND_RPAR:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_beg,
                     self.current_tok.pos_end,
@@ -626,7 +753,7 @@ class Parser:
         res.register_advancement()
         self.advance()
 
-        if self.current_tok.type == TOK_COLON:
+        if self.current_kind == KIND_COLON:
             res.register_advancement()
             self.advance()
 
@@ -641,7 +768,7 @@ class Parser:
                 False
             ))
 
-        if self.current_tok.type != TOK_NEWLINE:
+        if self.current_kind != KIND_NEWLINE:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_beg,
                 self.current_tok.pos_end,
@@ -655,7 +782,7 @@ class Parser:
         if res.error:
             return res
 
-        if not self.current_tok.is_match(TOK_KEYWORD, 'END'):
+        if self.current_kind != KIND_END:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_beg,
                 self.current_tok.pos_end,
@@ -677,7 +804,7 @@ class Parser:
         element_nodes = []
         pos_beg = self.current_tok.pos_beg.copy()
 
-        if self.current_tok.type != TOK_LSQUARE:
+        if self.current_kind != KIND_LSQUARE:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_beg,
                 self.current_tok.pos_end,
@@ -686,7 +813,7 @@ class Parser:
         res.register_advancement()
         self.advance()
 
-        if self.current_tok.type == TOK_RSQUARE:
+        if self.current_kind == KIND_RSQUARE:
             res.register_advancement()
             self.advance()
         else:
@@ -698,7 +825,7 @@ class Parser:
                     "'[' or 'NOT' "
                 ))
 
-            while self.current_tok.type == TOK_COMMA:
+            while self.current_kind == KIND_COMMA:
                 res.register_advancement()
                 self.advance()
 
@@ -706,7 +833,7 @@ class Parser:
                 if res.error:
                     return res
 
-            if self.current_tok.type != TOK_RSQUARE:
+            if self.current_kind != KIND_RSQUARE:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_beg, self.current_tok.pos_end,
                     f"Expected ',' or ']'"
@@ -728,7 +855,7 @@ class Parser:
         if res.error:
             return res
 
-        while self.current_tok.type in ops or (self.current_tok.type, self.current_tok.value) in ops:
+        while self.current_kind in ops:
             operator_token = self.current_tok
             res.register_advancement()
             self.advance()
@@ -1,22 +1,83 @@
+from bisect import bisect_right
+
+
+# ---------------- SOURCE -----------------
+
+# One per file. Positions only hold an offset into it; the line table is
+# built the first time a line number is asked for, usually to show an error.
+class Source:
+    __slots__ = ('name', 'text', 'line_starts')
+
+    def __init__(self, name, text):
+        self.name = name
+        self.text = text
+        self.line_starts = None
+
+    def line(self, index):
+        if self.line_starts is None:
+            text = self.text
+            starts = [0]
+            index_nl = text.find('\n')
+            while index_nl >= 0:
+                starts.append(index_nl + 1)
+                index_nl = text.find('\n', index_nl + 1)
+            self.line_starts = starts
+        return bisect_right(self.line_starts, index) - 1
+
+    def col(self, index):
+        return index - self.line_starts[self.line(index)]
+
+
 # --------------- POSITION ----------------
 
 class Position:
-    def __init__(self, index, line, col, name, text):
+    __slots__ = ('index', 'source')
+
+    def __init__(self, index, source):
         self.index = index
-        self.line = line
-        self.col = col
-        self.name = name
-        self.text = text
+        self.source = source
+
+    @property
+    def line(self):
+        return self.source.line(self.index)
+
+    @property
+    def col(self):
+        return self.source.col(self.index)
+
+    @property
+    def name(self):
+        return self.source.name
+
+    @property
+    def text(self):
+        return self.source.text
 
     def advance(self, current_char=None):
         self.index += 1
-        self.col += 1
+        return self
 
-        if current_char == '\n':
-            self.line += 1
-            self.col = 0
+    # The position right after this one's character. Past a newline that is
+    # still the end of the same line, not the start of the next.
+    def following(self):
+        if self.source.text.startswith('\n', self.index):
+            return LineEndPosition(self.index + 1, self.source)
+        return Position(self.index + 1, self.source)
 
-        return self
+    def copy(self):
+        return Position(self.index, self.source)
+
+
+class LineEndPosition(Position):
+    __slots__ = ()
+
+    @property
+    def line(self):
+        return self.source.line(self.index - 1)
+
+    @property
+    def col(self):
+        return self.source.col(self.index - 1) + 1
 
     def copy(self):
-        return Position(self.index, self.line, self.col, self.name, self.text)
\ No newline at end of file
+        return LineEndPosition(self.index, self.source)
@@ -0,0 +1,93 @@
+from .interpreter import *
+
+DEOPT_THRESHOLD = 16
+
+
+# ----------------- STATS -------------------
+
+class QuickeningStats:
+    def __init__(self):
+        self.specialized = 0
+        self.fallbacks = 0
+        self.deoptimized = 0
+
+    def reset(self):
+        self.__init__()
+
+    def __repr__(self):
+        return f"<quickening specialized={self.specialized} fallbacks={self.fallbacks} " \
+               f"deoptimized={self.deoptimized}>"
+
+
+stats = QuickeningStats()
+
+
+# ------------- SPECIALIZATION --------------
+
+class Specialization:
+    def __init__(self, kind, operation=None):
+        self.kind = kind
+        self.operation = operation
+        self.misses = 0
+
+
+def miss(node):
+    stats.fallbacks += 1
+    node.specialized.misses += 1
+    if node.specialized.misses > DEOPT_THRESHOLD:
+        node.specialized = False
+        stats.deoptimized += 1
+
+
+# --------- QUICKENING INTERPRETER ----------
+
+class QuickeningInterpreter(Interpreter):
+    def execute_BinOpNode(self, node, context):
+        res = RTResult()
+        left = res.register(self.execute(node.left_node, context))
+        if res.error:
+            return res
+
+        if node.operator_token.type == TOK_KEYWORD:
+            result = short_circuit(node, left)
+            if result is not None:
+                return res.success(result)
+
+        right = res.register(self.execute(node.right_node, context))
+        if res.error:
+            return res
+
+        specialized = node.specialized
+        if specialized:
+            if type(left) is Number and type(right) is Number and (specialized.kind != 'divide' or right.value):
+                result = Number(specialized.operation(left.value, right.value))
+                result.context = left.context
+                result.pos_beg = node.pos_beg
+                result.pos_end = node.pos_end
+                return res.success(result)
+            miss(node)
+        elif specialized is None and type(left) is Number and type(right) is Number:
+            token = node.operator_token
+            operation = NUMBER_OPERATIONS.get(token.value if token.type == TOK_KEYWORD else token.type)
+            if operation:
+                node.specialized = Specialization('divide' if token.type == TOK_DIV else 'number', operation)
+                stats.specialized += 1
+
+        return self.apply_bin_op(node, left, right)
+
+    def execute_VarAccessNode(self, node, context):
+        specialized = node.specialized
+        if specialized:
+            value = context.symbol_table.symbols.get(node.var_name_token.value)
+            if type(value) is Number:
+                copy = Number(value.value)
+                copy.pos_beg = node.pos_beg
+                copy.pos_end = node.pos_end
+                copy.context = context
+                return RTResult().success(copy)
+            miss(node)
+        elif specialized is None and type(context.symbol_table.symbols.get(node.var_name_token.value)) is Number:
+            node.specialized = Specialization('local_number')
+            stats.specialized += 1
+
+        return Interpreter.execute_VarAccessNode(node, context)
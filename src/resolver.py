@@ -0,0 +1,168 @@
+from .interpreter import *
+
+SLOT_LOCAL = 0
+SLOT_GLOBAL = 1
+
+
+# ----------------- FRAME -------------------
+
+class Frame(SymbolTable):
+    def __init__(self, layout, parent=None):
+        super().__init__(parent)
+        self.layout = layout
+        self.slots = [None] * len(layout)
+
+    def get(self, name):
+        index = self.layout.get(name)
+        value = self.slots[index] if index is not None else self.symbols.get(name, None)
+        if value is None and self.parent:
+            return self.parent.get(name)
+        return value
+
+    def set(self, name, value):
+        index = self.layout.get(name)
+        if index is not None:
+            self.slots[index] = value
+        else:
+            self.symbols[name] = value
+
+    def remove(self, name):
+        index = self.layout.get(name)
+        if index is not None:
+            self.slots[index] = None
+        else:
+            del self.symbols[name]
+
+
+# --------------- RESOLVER ------------------
+
+class Resolver:
+    def __init__(self, symbol_table=global_symbol_table):
+        self.symbol_table = symbol_table
+
+    def resolve(self, node):
+        bound_names(self.symbol_table).add(node)
+        for func_def in walk(node):
+            if isinstance(func_def, FuncDefNode):
+                func_def.layout = self.layout(func_def)
+
+        self.annotate(node, None)
+        return node
+
+    @staticmethod
+    def body_bound_names(body_node):
+        todo = [body_node]
+        while todo:
+            node = todo.pop()
+            if isinstance(node, (VarAssignNode, ForNode)):
+                yield node.var_name_token.value
+            if isinstance(node, FuncDefNode):
+                if node.var_name_token:
+                    yield node.var_name_token.value
+                continue
+            todo.extend(iter_child_nodes(node))
+
+    def layout(self, func_def):
+        layout = {}
+        for arg_name in func_def.arg_name_tokens:
+            layout.setdefault(arg_name.value, len(layout))
+        for name in self.body_bound_names(func_def.body_node):
+            layout.setdefault(name, len(layout))
+        return layout
+
+    @staticmethod
+    def slot(name, layout):
+        if layout is not None and name in layout:
+            return SLOT_LOCAL, layout[name]
+        return SLOT_GLOBAL, name
+
+    def annotate(self, node, layout):
+        if isinstance(node, (VarAccessNode, VarAssignNode)):
+            node.slot = self.slot(node.var_name_token.value, layout)
+
+        if isinstance(node, FuncDefNode):
+            self.annotate(node.body_node, node.layout)
+            return
+
+        for child in iter_child_nodes(node):
+            self.annotate(child, layout)
+
+
+# ------------ SLOT FUNCTION ----------------
+
+class SlotFunction(Function):
+    __slots__ = ('layout',)
+
+    def __init__(self, name, body_node, arg_names, null_check, interpreter, layout):
+        super().__init__(name, body_node, arg_names, null_check, interpreter)
+        self.layout = layout
+
+    def generate_new_context(self):
+        new_context = Context(self.name, self.context, self.pos_beg)
+        new_context.symbol_table = Frame(self.layout, new_context.parent.symbol_table)
+        return new_context
+
+    def copy(self):
+        copy = SlotFunction(self.name, self.body_node, self.arg_names, self.null_check, self.interpreter, self.layout)
+        copy.context = self.context
+        copy.body_names = self.body_names
+        copy.set_pos(self.pos_beg, self.pos_end)
+        return copy
+
+
+# ----------- SLOT INTERPRETER --------------
+
+class SlotInterpreter(Interpreter):
+    def __init__(self, symbol_table=global_symbol_table):
+        # Names bound in a function frame, which a global slot may not read
+        # straight from the global table. The set grows with every program
+        # run against the table, so this sees names bound after resolving.
+        self.function_bound_names = bound_names(symbol_table).function_names
+
+    def execute_VarAccessNode(self, node, context):
+        slot = node.slot
+        if slot is None or (slot[0] == SLOT_GLOBAL and slot[1] in self.function_bound_names):
+            return Interpreter.execute_VarAccessNode(node, context)
+
+        symbol_table = context.symbol_table
+        if slot[0] == SLOT_LOCAL:
+            value = symbol_table.slots[slot[1]]
+            if value is None and symbol_table.parent:
+                value = symbol_table.parent.get(node.var_name_token.value)
+        else:
+            value = symbol_table.root.symbols.get(slot[1])
+
+        if not value:
+            return RTResult().failure(RTError(
+                node.pos_beg,
+                node.pos_end,
+                f"'{node.var_name_token.value}' is not defined",
+                context))
+
+        return RTResult().success(value.copy().set_pos(node.pos_beg, node.pos_end).set_context(context))
+
+    def execute_VarAssignNode(self, node, context):
+        slot = node.slot
+        if slot is None or slot[0] != SLOT_LOCAL:
+            return Interpreter.execute_VarAssignNode(self, node, context)
+
+        res = RTResult()
+        value = res.register(self.execute(node.value_node, context))
+        if res.error:
+            return res
+
+        context.symbol_table.slots[slot[1]] = value
+        return res.success(value)
+
+    def execute_FuncDefNode(self, node, context):
+        res = RTResult()
+
+        func_name = node.var_name_token.value if node.var_name_token else None
+        arg_names = [arg_name.value for arg_name in node.arg_name_tokens]
+        func_value = SlotFunction(func_name, node.body_node, arg_names, node.null_check, self, node.layout) \
+            .set_context(context).set_pos(node.pos_beg, node.pos_end)
+
+        if node.var_name_token:
+            context.symbol_table.set(func_name, func_value)
+
+        return res.success(func_value)
@@ -0,0 +1,223 @@
+from .unwind import *
+
+MAX_CALL_DEPTH = 10000
+
+
+# ------------- STACK FUNCTION --------------
+
+class StackFunction(Function):
+    __slots__ = ()
+
+    def copy(self):
+        copy = StackFunction(self.name, self.body_node, self.arg_names, self.null_check, self.interpreter)
+        copy.context = self.context
+        copy.body_names = self.body_names
+        copy.set_pos(self.pos_beg, self.pos_end)
+        return copy
+
+
+# ------------ STACK INTERPRETER ------------
+
+# Nodes with children are evaluated by steps_X generators that yield
+# (node, context) for every child they need and receive its value back, so
+# nesting lives on the heap instead of the Python stack. Leaves keep the
+# plain evaluate_X methods.
+class StackInterpreter(UnwindingInterpreter):
+    def __init__(self, max_depth=MAX_CALL_DEPTH):
+        self.max_depth = max_depth
+        self.depth = 0
+
+    def evaluate(self, node, context):
+        return self.run(node, context)
+
+    def run(self, node, context):
+        depth = self.depth
+        stack = []
+        value = self.start(node, context, stack)
+
+        try:
+            while stack:
+                try:
+                    child_node, child_context = stack[-1].send(value)
+                except StopIteration as stop:
+                    stack.pop()
+                    value = stop.value
+                    continue
+                value = self.start(child_node, child_context, stack)
+        except Error:
+            self.depth = depth
+            raise
+
+        return value
+
+    def start(self, node, context, stack):
+        steps = getattr(self, f'steps_{type(node).__name__}', None)
+        if steps is None:
+            return super().evaluate(node, context)
+        stack.append(steps(node, context))
+        return None
+
+    def steps_InvariantNode(self, node, context):
+        value = node.cached(context)
+        if value is None:
+            value = yield node.node, context
+            if isinstance(value, (Number, String)):
+                node.remember(context, value)
+        return value
+
+    def steps_VarAssignNode(self, node, context):
+        value = yield node.value_node, context
+        context.symbol_table.set(node.var_name_token.value, value)
+        return value
+
+    def steps_BinOpNode(self, node, context):
+        left = yield node.left_node, context
+        if node.operator_token.type == TOK_KEYWORD:
+            result = short_circuit(node, left)
+            if result is not None:
+                return result
+        right = yield node.right_node, context
+
+        result, error = getattr(left, operator_method_name(node.operator_token))(right)
+        if error:
+            raise error
+        return result.set_pos(node.pos_beg, node.pos_end)
+
+    def steps_UnaryOpNode(self, node, context):
+        number = yield node.node, context
+        error = None
+        if node.operator_token.type == TOK_MINUS:
+            number, error = number.multiply(Number(-1))
+        elif node.operator_token.is_match(TOK_KEYWORD, 'NOT'):
+            number, error = number.logical_not()
+        if error:
+            raise error
+        return number.set_pos(node.pos_beg, node.pos_end)
+
+    def steps_IfNode(self, node, context):
+        for condition, expr, null_check in node.cases:
+            condition_value = yield condition, context
+            if condition_value.is_true():
+                expr_value = yield expr, context
+                return Number.null if null_check else expr_value
+
+        if node.else_case:
+            expr, null_check = node.else_case
+            expr_value = yield expr, context
+            return Number.null if null_check else expr_value
+
+        return Number.null
+
+    def steps_WhileNode(self, node, context):
+        elements = [] if node.value_used and not node.null_check else None
+        node.generation += 1
+
+        while True:
+            condition = yield node.condition_node, context
+            if not condition.is_true():
+                break
+            value = yield node.body_node, context
+            if elements is not None:
+                elements.append(value)
+
+        return Number.null if elements is None else List(elements).set_context(context).set_pos(node.pos_beg, node.pos_end)
+
+    def steps_ForNode(self, node, context):
+        elements = [] if node.value_used and not node.null_check else None
+        node.generation += 1
+
+        start_value = yield node.start_value_node, context
+        end_value = yield node.end_value_node, context
+        if node.step_value_node:
+            step_value = yield node.step_value_node, context
+        else:
+            step_value = Number(1)
+
+        var_name = node.var_name_token.value
+        i = start_value.value
+        step = step_value.value
+        ascending = step >= 0
+
+        while i < end_value.value if ascending else i > end_value.value:
+            context.symbol_table.set(var_name, Number(i))
+            i += step
+            value = yield node.body_node, context
+            if elements is not None:
+                elements.append(value)
+
+        return Number.null if elements is None else List(elements).set_context(context).set_pos(node.pos_beg, node.pos_end)
+
+    def evaluate_FuncDefNode(self, node, context):
+        func_name = node.var_name_token.value if node.var_name_token else None
+        arg_names = [arg_name.value for arg_name in node.arg_name_tokens]
+        func_value = StackFunction(func_name, node.body_node, arg_names, node.null_check, self) \
+            .set_context(context).set_pos(node.pos_beg, node.pos_end)
+
+        if node.var_name_token:
+            context.symbol_table.set(func_name, func_value)
+
+        return func_value
+
+    def steps_CallNode(self, node, context):
+        value_to_call = yield node.node_to_call, context
+        value_to_call = value_to_call.copy().set_pos(node.pos_beg, node.pos_end)
+        args = []
+        for arg_node in node.arg_nodes:
+            args.append((yield arg_node, context))
+
+        # A memoized function's body runs here as well, so a chain of cache
+        # misses stays off the Python stack.
+        memo = None
+        if type(value_to_call) is MemoFunction and isinstance(value_to_call.func, StackFunction):
+            memo = value_to_call
+            key, return_value, error = memo.lookup(args)
+            if error:
+                raise error
+            if return_value is not None:
+                return return_value.copy().set_pos(node.pos_beg, node.pos_end).set_context(context)
+            value_to_call = memo.bound_func()
+
+        if isinstance(value_to_call, StackFunction):
+            exec_ctx = value_to_call.generate_new_context()
+            res = value_to_call.check_and_populate_args(value_to_call.arg_names, args, exec_ctx)
+            if res.error:
+                raise res.error
+
+            self.enter_call(node, context)
+            return_value = yield value_to_call.body_node, exec_ctx
+            self.depth -= 1
+            if value_to_call.null_check:
+                return_value = Number.null
+            if memo is not None:
+                memo.remember(key, return_value)
+        else:
+            # Builtins, other memoized functions and functions from other
+            # engines run on the Python stack, and count all the same.
+            self.enter_call(node, context)
+            res = value_to_call.execute(args)
+            self.depth -= 1
+            if res.error:
+                raise res.error
+            return_value = res.value
+
+        return return_value.copy().set_pos(node.pos_beg, node.pos_end).set_context(context)
+
+    def enter_call(self, node, context):
+        if self.depth >= self.max_depth:
+            raise RTError(
+                node.pos_beg, node.pos_end,
+                f"Maximum call depth of {self.max_depth} exceeded",
+                context
+            )
+        self.depth += 1
+
+    def steps_ListNode(self, node, context):
+        elements = [] if node.value_used else None
+        value = Number.null
+        for element_node in node.element_nodes:
+            value = yield element_node, context
+            if elements is not None:
+                elements.append(value)
+        if elements is None:
+            return value
+        return List(elements).set_context(context).set_pos(node.pos_beg, node.pos_end)
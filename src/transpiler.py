@@ -0,0 +1,603 @@
+from .interpreter import *
+from .bytecode import operator_method_name
+
+TIER_UP_CALLS = 50
+# compile() only takes so many nested parentheses, so every this many levels
+# of the tree an expression is put in a temp.
+SPILL_DEPTH = 16
+
+
+# ------------ TRANSPILE RUNTIME ------------
+
+class TranspileFailure(Exception):
+    def __init__(self, error):
+        super().__init__(error.details)
+        self.error = error
+
+
+def rt_number(value, context, node):
+    return Number(value).set_context(context).set_pos(node.pos_beg, node.pos_end)
+
+
+def rt_string(value, context, node):
+    return String(value).set_context(context).set_pos(node.pos_beg, node.pos_end)
+
+
+def rt_load(symbol_table, name, context, node):
+    value = symbol_table.get(name)
+    if not value:
+        raise TranspileFailure(RTError(node.pos_beg, node.pos_end, f"'{name}' is not defined", context))
+    return value.copy().set_pos(node.pos_beg, node.pos_end).set_context(context)
+
+
+def rt_local(value, symbol_table, name, context, node):
+    if value is None:
+        return rt_load(symbol_table, name, context, node)
+    return value.copy().set_pos(node.pos_beg, node.pos_end).set_context(context)
+
+
+def rt_binop(left, method_name, right, node):
+    result, error = getattr(left, method_name)(right)
+    if error:
+        raise TranspileFailure(error)
+    return result.set_pos(node.pos_beg, node.pos_end)
+
+
+def rt_unary(number, method_name, node):
+    error = None
+    if method_name == 'negate':
+        number, error = number.multiply(Number(-1))
+    elif method_name == 'logical_not':
+        number, error = number.logical_not()
+    if error:
+        raise TranspileFailure(error)
+    return number.set_pos(node.pos_beg, node.pos_end)
+
+
+def rt_list(elements, context, node):
+    return List(elements).set_context(context).set_pos(node.pos_beg, node.pos_end)
+
+
+def rt_call(value_to_call, args, context, node):
+    value_to_call = value_to_call.copy().set_pos(node.pos_beg, node.pos_end)
+    res = value_to_call.execute(args)
+    if res.error:
+        raise TranspileFailure(res.error)
+    return res.value.copy().set_pos(node.pos_beg, node.pos_end).set_context(context)
+
+
+def rt_function(py_func, context, node):
+    func_name = node.var_name_token.value if node.var_name_token else None
+    arg_names = [arg_name.value for arg_name in node.arg_name_tokens]
+    func_value = TranspiledFunction(func_name, node.body_node, arg_names, node.null_check, py_func) \
+        .set_context(context).set_pos(node.pos_beg, node.pos_end)
+    if func_name:
+        context.symbol_table.set(func_name, func_value)
+    return func_value
+
+
+def rt_remember(node, context, value):
+    if isinstance(value, (Number, String)):
+        node.remember(context, value)
+    return value
+
+
+def rt_range(start_value, end_value, step_value):
+    i = start_value.value
+    step = step_value.value if step_value else 1
+    if type(i) is int and type(end_value.value) is int and type(step) is int and step != 0:
+        return range(i, end_value.value, step)
+    return rt_generic_range(i, end_value, step)
+
+
+def rt_generic_range(i, end_value, step):
+    if step >= 0:
+        while i < end_value.value:
+            yield i
+            i += step
+    else:
+        while i > end_value.value:
+            yield i
+            i += step
+
+
+RUNTIME = {
+    'Number': Number,
+    '_number': rt_number,
+    '_string': rt_string,
+    '_load': rt_load,
+    '_local': rt_local,
+    '_binop': rt_binop,
+    '_unary': rt_unary,
+    '_list': rt_list,
+    '_call': rt_call,
+    '_function': rt_function,
+    '_remember': rt_remember,
+    '_short': short_circuit,
+    '_range': rt_range,
+}
+
+# The helpers generated code calls. Most are handed the node they work on.
+RUNTIME_CODES = {func.__code__ for func in RUNTIME.values() if hasattr(func, '__code__')}
+
+
+# ----------- TRANSPILED FUNCTION -----------
+
+class TranspiledFunction(Function):
+    __slots__ = ('py_func',)
+
+    def __init__(self, name, body_node, arg_names, null_check, py_func):
+        super().__init__(name, body_node, arg_names, null_check)
+        self.py_func = py_func
+
+    def execute(self, args):
+        res = RTResult()
+        exec_ctx = self.generate_new_context()
+
+        res.register(self.check_and_populate_args(self.arg_names, args, exec_ctx))
+        if res.error:
+            return res
+
+        try:
+            value = self.py_func(exec_ctx)
+        except TranspileFailure as failure:
+            return res.failure(failure.error)
+        return res.success(Number.null if self.null_check else value)
+
+    def copy(self):
+        copy = TranspiledFunction(self.name, self.body_node, self.arg_names, self.null_check, self.py_func)
+        copy.context = self.context
+        copy.body_names = self.body_names
+        copy.set_pos(self.pos_beg, self.pos_end)
+        return copy
+
+
+# --------------- SOURCE MAP ----------------
+
+class SourceMap:
+    def __init__(self, filename):
+        self.filename = filename
+        self.nodes = {}
+
+    def add(self, lineno, node):
+        if node is not None:
+            self.nodes[lineno] = node
+
+    def lookup(self, lineno):
+        node = self.nodes.get(lineno)
+        return (node.pos_beg, node.pos_end) if node else (None, None)
+
+    # A generated line only maps to the statement it belongs to, so a
+    # runtime helper further in, which knows the node it was working on,
+    # gives the closer position.
+    def annotate(self, exception):
+        tb = exception.__traceback__
+        pos_beg = None
+        while tb:
+            frame = tb.tb_frame
+            if frame.f_code.co_filename == self.filename:
+                pos_beg = self.lookup(tb.tb_lineno)[0] or pos_beg
+            elif frame.f_code in RUNTIME_CODES and isinstance(frame.f_locals.get('node'), ASTNode):
+                pos_beg = frame.f_locals['node'].pos_beg
+            tb = tb.tb_next
+        if pos_beg:
+            exception.add_note(f'CapPyro: File {pos_beg.name}, line {pos_beg.line + 1}')
+
+
+# ----------- TRANSPILED PROGRAM ------------
+
+class TranspiledProgram:
+    def __init__(self, source, source_map, namespace, entry):
+        self.source = source
+        self.source_map = source_map
+        self.namespace = namespace
+        self.entry = entry
+
+    def run(self, context):
+        res = RTResult()
+        try:
+            return res.success(self.namespace[self.entry](context))
+        except TranspileFailure as failure:
+            return res.failure(failure.error)
+        except Exception as exception:
+            self.source_map.annotate(exception)
+            raise
+
+
+# --------------- TRANSPILER ----------------
+
+class FunctionEmitter:
+    def __init__(self, name, local_names):
+        self.name = name
+        self.local_names = local_names
+        self.lines = []
+        self.indent = 1
+        self.temp_cnt = 0
+        self.depth = 0
+
+    def emit(self, text, node=None):
+        self.lines.append((self.indent, text, node))
+
+    def insert(self, index, text, node=None):
+        self.lines.insert(index, (self.indent, text, node))
+
+    def temp(self):
+        self.temp_cnt += 1
+        return f'_t{self.temp_cnt}'
+
+
+class Transpiler:
+    def __init__(self, name='<program>'):
+        self.filename = f'<cappyro {name}>'
+        self.functions = []
+        self.nodes = []
+        self.node_indices = {}
+        self.emitter = None
+
+    def transpile(self, node):
+        return self.build('_program', node, None)
+
+    def transpile_function(self, node):
+        arg_names = [arg_name.value for arg_name in node.arg_name_tokens]
+        return self.build('_function', node.body_node, arg_names)
+
+    # Generating and compiling both recurse as deep as the tree goes. A tree
+    # too deep for either gives None, and is left to the tree interpreter.
+    def build(self, name, body_node, arg_names):
+        source_map = SourceMap(self.filename)
+        source_lines = []
+        try:
+            entry = self.function(name, body_node, arg_names)
+            for emitter in self.functions:
+                source_lines.append(f'def {emitter.name}(_ctx):')
+                for indent, text, node in emitter.lines:
+                    source_lines.append('    ' * indent + text)
+                    source_map.add(len(source_lines), node)
+                source_lines.append('')
+
+            source = '\n'.join(source_lines)
+            code = compile(source, self.filename, 'exec')
+        except (SyntaxError, RecursionError):
+            return None
+
+        namespace = dict(RUNTIME)
+        namespace['_N'] = self.nodes
+        exec(code, namespace)
+        return TranspiledProgram(source, source_map, namespace, entry)
+
+    # ------------ analysis ------------
+
+    @staticmethod
+    def local_names(body_node, arg_names):
+        if arg_names is None:
+            return set()
+
+        names = set(arg_names)
+        for node in walk(body_node):
+            if isinstance(node, (CallNode, FuncDefNode)):
+                return set()
+            if isinstance(node, (VarAssignNode, ForNode)):
+                names.add(node.var_name_token.value)
+        return names
+
+    # ------------ emitters ------------
+
+    def function(self, name, body_node, arg_names):
+        name = f'{name}_{len(self.functions)}'
+        emitter = FunctionEmitter(name, self.local_names(body_node, arg_names))
+        self.functions.append(emitter)
+
+        outer, self.emitter = self.emitter, emitter
+        emitter.emit('_st = _ctx.symbol_table')
+        for local_name in sorted(emitter.local_names):
+            emitter.emit(f'{self.local(local_name)} = _st.symbols.get({local_name!r})')
+        emitter.emit(f'return {self.expression(body_node)}', body_node)
+        self.emitter = outer
+        return name
+
+    @staticmethod
+    def local(name):
+        return f'v_{name}'
+
+    def node_ref(self, node):
+        index = self.node_indices.get(id(node))
+        if index is None:
+            index = self.node_indices[id(node)] = len(self.nodes)
+            self.nodes.append(node)
+        return f'_N[{index}]'
+
+    def expression(self, node):
+        method_name = f'expression_{type(node).__name__}'
+        method = getattr(self, method_name, self.no_expression_method)
+        emitter = self.emitter
+        emitter.depth += 1
+        expr = method(node)
+        emitter.depth -= 1
+        if emitter.depth % SPILL_DEPTH == SPILL_DEPTH - 1 and not expr.startswith('_t'):
+            expr = self.assign_temp(expr, node)
+        return expr
+
+    def no_expression_method(self, node):
+        raise Exception(f'No expression_{type(node).__name__} method defined')
+
+    def expressions(self, nodes):
+        exprs = []
+        for node in nodes:
+            mark = len(self.emitter.lines)
+            expr = self.expression(node)
+            if len(self.emitter.lines) != mark:
+                for i, earlier in enumerate(exprs):
+                    if not earlier.startswith('_t'):
+                        temp = self.emitter.temp()
+                        self.emitter.insert(mark, f'{temp} = {earlier}')
+                        mark += 1
+                        exprs[i] = temp
+            exprs.append(expr)
+        return exprs
+
+    def assign_temp(self, expr, node=None):
+        temp = self.emitter.temp()
+        self.emitter.emit(f'{temp} = {expr}', node)
+        return temp
+
+    def expression_NumberNode(self, node):
+        # Read from the node, since the repr of inf or nan isn't a literal.
+        node_ref = self.node_ref(node)
+        return f'_number({node_ref}.tok.value, _ctx, {node_ref})'
+
+    def expression_StringNode(self, node):
+        return f'_string({node.tok.value!r}, _ctx, {self.node_ref(node)})'
+
+    def expression_ConstNode(self, node):
+        return f'{self.node_ref(node)}.value.set_context(_ctx)'
+
+    def expression_InvariantNode(self, node):
+        emitter = self.emitter
+        node_ref = self.node_ref(node)
+        result = self.assign_temp(f'{node_ref}.cached(_ctx)', node)
+        emitter.emit(f'if {result} is None:')
+        emitter.indent += 1
+        emitter.emit(f'{result} = _remember({node_ref}, _ctx, {self.expression(node.node)})', node.node)
+        emitter.indent -= 1
+        return result
+
+    def expression_VarAccessNode(self, node):
+        var_name = node.var_name_token.value
+        if var_name in self.emitter.local_names:
+            return f'_local({self.local(var_name)}, _st, {var_name!r}, _ctx, {self.node_ref(node)})'
+        return f'_load(_st, {var_name!r}, _ctx, {self.node_ref(node)})'
+
+    def expression_VarAssignNode(self, node):
+        var_name = node.var_name_token.value
+        value = self.assign_temp(self.expression(node.value_node), node)
+        if var_name in self.emitter.local_names:
+            self.emitter.emit(f'{self.local(var_name)} = {value}', node)
+        else:
+            self.emitter.emit(f'_st.set({var_name!r}, {value})', node)
+        return value
+
+    def expression_BinOpNode(self, node):
+        method_name = operator_method_name(node.operator_token)
+        if node.operator_token.type == TOK_KEYWORD:
+            return self.short_circuit(node, method_name)
+
+        left, right = self.expressions((node.left_node, node.right_node))
+        return f'_binop({left}, {method_name!r}, {right}, {self.node_ref(node)})'
+
+    def short_circuit(self, node, method_name):
+        emitter = self.emitter
+        node_ref = self.node_ref(node)
+        left = self.assign_temp(self.expression(node.left_node), node.left_node)
+        result = self.assign_temp(f'_short({node_ref}, {left})', node)
+        emitter.emit(f'if {result} is None:')
+        emitter.indent += 1
+        right = self.expression(node.right_node)
+        emitter.emit(f'{result} = _binop({left}, {method_name!r}, {right}, {node_ref})', node)
+        emitter.indent -= 1
+        return result
+
+    def expression_UnaryOpNode(self, node):
+        operand = self.expression(node.node)
+        if node.operator_token.type == TOK_MINUS:
+            method_name = 'negate'
+        elif node.operator_token.is_match(TOK_KEYWORD, 'NOT'):
+            method_name = 'logical_not'
+        else:
+            method_name = None
+        return f'_unary({operand}, {method_name!r}, {self.node_ref(node)})'
+
+    def expression_IfNode(self, node):
+        result = self.emitter.temp()
+        emitter = self.emitter
+        depth = 0
+
+        for condition, expr, null_check in node.cases:
+            condition_expr = self.expression(condition)
+            emitter.emit(f'if {condition_expr}.is_true():', condition)
+            emitter.indent += 1
+            self.branch(result, expr, null_check)
+            emitter.indent -= 1
+            emitter.emit('else:')
+            emitter.indent += 1
+            depth += 1
+
+        if node.else_case:
+            self.branch(result, *node.else_case)
+        else:
+            emitter.emit(f'{result} = Number.null')
+
+        emitter.indent -= depth
+        return result
+
+    def branch(self, result, expr, null_check):
+        value = self.expression(expr)
+        if null_check:
+            self.emitter.emit(value, expr)
+            self.emitter.emit(f'{result} = Number.null')
+        else:
+            self.emitter.emit(f'{result} = {value}', expr)
+
+    def expression_WhileNode(self, node):
+        emitter = self.emitter
+        elements = self.loop_elements(node)
+        emitter.emit(f'{self.node_ref(node)}.generation += 1')
+        emitter.emit('while True:', node)
+        emitter.indent += 1
+        condition = self.expression(node.condition_node)
+        emitter.emit(f'if not {condition}.is_true():', node.condition_node)
+        emitter.emit('    break')
+        self.loop_body(elements, node.body_node)
+        emitter.indent -= 1
+        return self.loop_result(elements, node)
+
+    def expression_ForNode(self, node):
+        emitter = self.emitter
+        var_name = node.var_name_token.value
+        bounds = [node.start_value_node, node.end_value_node]
+        if node.step_value_node:
+            bounds.append(node.step_value_node)
+        bounds = self.expressions(bounds)
+        if len(bounds) == 2:
+            bounds.append('None')
+
+        elements = self.loop_elements(node)
+        counter = emitter.temp()
+        emitter.emit(f'{self.node_ref(node)}.generation += 1')
+        emitter.emit(f'for {counter} in _range({", ".join(bounds)}):', node)
+        emitter.indent += 1
+        if var_name in emitter.local_names:
+            emitter.emit(f'{self.local(var_name)} = Number({counter})', node)
+        else:
+            emitter.emit(f'_st.set({var_name!r}, Number({counter}))', node)
+        self.loop_body(elements, node.body_node)
+        emitter.indent -= 1
+        return self.loop_result(elements, node)
+
+    # A loop whose value is thrown away gets no list to collect into.
+    def loop_elements(self, node):
+        if node.null_check or not node.value_used:
+            return None
+        elements = self.emitter.temp()
+        self.emitter.emit(f'{elements} = []')
+        return elements
+
+    def loop_body(self, elements, body_node):
+        value = self.expression(body_node)
+        if elements is None:
+            self.emitter.emit(value, body_node)
+        else:
+            self.emitter.emit(f'{elements}.append({value})', body_node)
+
+    def loop_result(self, elements, node):
+        if elements is None:
+            return 'Number.null'
+        return self.assign_temp(f'_list({elements}, _ctx, {self.node_ref(node)})', node)
+
+    def expression_FuncDefNode(self, node):
+        arg_names = [arg_name.value for arg_name in node.arg_name_tokens]
+        func_name = node.var_name_token.value if node.var_name_token else 'anonymous'
+        py_func = self.function(f'_func_{func_name}', node.body_node, arg_names)
+        return self.assign_temp(f'_function({py_func}, _ctx, {self.node_ref(node)})', node)
+
+    def expression_CallNode(self, node):
+        exprs = self.expressions([node.node_to_call] + node.arg_nodes)
+        return f'_call({exprs[0]}, [{", ".join(exprs[1:])}], _ctx, {self.node_ref(node)})'
+
+    def expression_ListNode(self, node):
+        if not node.value_used:
+            value = 'Number.null'
+            for index, element_node in enumerate(node.element_nodes):
+                if index:
+                    self.emitter.emit(value, node.element_nodes[index - 1])
+                value = self.expression(element_node)
+            return value
+
+        elements = self.expressions(node.element_nodes)
+        return f'_list([{", ".join(elements)}], _ctx, {self.node_ref(node)})'
+
+
+# ---------------- TIERING ------------------
+
+class TierState:
+    def __init__(self, node):
+        self.node = node
+        self.calls = 0
+        self.py_func = None
+
+
+class Tiering:
+    def __init__(self, tier_up_calls=TIER_UP_CALLS):
+        self.tier_up_calls = tier_up_calls
+        self.tiers = {}
+
+    def tier_for(self, node):
+        tier = self.tiers.get(id(node))
+        if tier is None or tier.node is not node:
+            tier = self.tiers[id(node)] = TierState(node)
+        return tier
+
+    def record_call(self, tier, name):
+        tier.calls += 1
+        # Only one try: a body too deep to transpile stays on the tree tier.
+        if tier.calls == self.tier_up_calls + 1:
+            program = Transpiler(name).transpile_function(tier.node)
+            if program is not None:
+                tier.py_func = program.namespace[program.entry]
+
+
+class TieredFunction(Function):
+    __slots__ = ('tiering', 'tier')
+
+    def __init__(self, name, body_node, arg_names, null_check, tiering, tier):
+        super().__init__(name, body_node, arg_names, null_check)
+        self.tiering = tiering
+        self.tier = tier
+
+    def execute(self, args):
+        tier = self.tier
+        if tier.py_func is None:
+            self.tiering.record_call(tier, self.name)
+
+        res = RTResult()
+        exec_ctx = self.generate_new_context()
+
+        res.register(self.check_and_populate_args(self.arg_names, args, exec_ctx))
+        if res.error:
+            return res
+
+        if tier.py_func is not None:
+            try:
+                value = tier.py_func(exec_ctx)
+            except TranspileFailure as failure:
+                return res.failure(failure.error)
+        else:
+            value = res.register(TieredInterpreter(self.tiering).execute(self.body_node, exec_ctx))
+            if res.error:
+                return res
+        return res.success(Number.null if self.null_check else value)
+
+    def copy(self):
+        copy = TieredFunction(self.name, self.body_node, self.arg_names, self.null_check, self.tiering, self.tier)
+        copy.context = self.context
+        copy.body_names = self.body_names
+        copy.set_pos(self.pos_beg, self.pos_end)
+        return copy
+
+
+class TieredInterpreter(Interpreter):
+    def __init__(self, tiering):
+        self.tiering = tiering
+
+    def execute_FuncDefNode(self, node, context):
+        res = RTResult()
+
+        func_name = node.var_name_token.value if node.var_name_token else None
+        arg_names = [arg_name.value for arg_name in node.arg_name_tokens]
+        func_value = TieredFunction(func_name, node.body_node, arg_names, node.null_check, self.tiering,
+                                    self.tiering.tier_for(node)).set_context(context).set_pos(node.pos_beg,
+                                                                                              node.pos_end)
+
+        if node.var_name_token:
+            context.symbol_table.set(func_name, func_value)
+
+        return res.success(func_value)
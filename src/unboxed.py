@@ -0,0 +1,246 @@
+from .unwind import *
+
+NUMBER_TYPES = (int, float, complex)
+RAW_TYPES = (int, float, complex, str)
+
+
+def box(value, node, context):
+    if isinstance(value, Value):
+        return value
+    node = value_node(node)
+    value = String(value) if isinstance(value, str) else Number(value)
+    return value.set_context(context).set_pos(node.pos_beg, node.pos_end)
+
+
+def unbox(value):
+    if isinstance(value, (Number, String)):
+        return value.value
+    return value
+
+
+# The node whose position a value evaluated from node would carry.
+def value_node(node):
+    while True:
+        if isinstance(node, VarAssignNode):
+            node = node.value_node
+        elif isinstance(node, InvariantNode):
+            node = node.node
+        elif isinstance(node, IfNode) and node.taken:
+            node = node.taken
+        else:
+            return node
+
+
+def is_true(value):
+    if isinstance(value, Value):
+        return value.is_true()
+    if isinstance(value, str):
+        return len(value) > 0
+    return value != 0
+
+
+# ------------ UNBOXED FUNCTION -------------
+
+class UnboxedFunction(Function):
+    __slots__ = ()
+
+    def call(self, args):
+        exec_ctx = self.generate_new_context()
+
+        res = self.check_and_populate_args(self.arg_names, args, exec_ctx)
+        if res.error:
+            raise res.error
+
+        value = self.interpreter.evaluate(self.body_node, exec_ctx)
+        return 0 if self.null_check else value
+
+    def execute(self, args):
+        try:
+            return RTResult().success(box(self.call(args), self.body_node, self.context))
+        except Error as error:
+            return RTResult().failure(error)
+
+    def copy(self):
+        copy = UnboxedFunction(self.name, self.body_node, self.arg_names, self.null_check, self.interpreter)
+        copy.context = self.context
+        copy.body_names = self.body_names
+        copy.set_pos(self.pos_beg, self.pos_end)
+        return copy
+
+
+# ----------- UNBOXED INTERPRETER -----------
+
+class UnboxedInterpreter(UnwindingInterpreter):
+    def execute(self, node, context):
+        try:
+            return RTResult().success(box(self.evaluate(node, context), node, context))
+        except Error as error:
+            return RTResult().failure(error)
+
+    @staticmethod
+    def evaluate_NumberNode(node, context):
+        return node.tok.value
+
+    @staticmethod
+    def evaluate_StringNode(node, context):
+        return node.tok.value
+
+    @staticmethod
+    def evaluate_ConstNode(node, context):
+        return node.value.value
+
+    def evaluate_InvariantNode(self, node, context):
+        value = node.cached(context)
+        if value is None:
+            value = self.evaluate(node.node, context)
+            if type(value) in RAW_TYPES:
+                node.remember(context, value)
+        return value
+
+    @staticmethod
+    def evaluate_VarAccessNode(node, context):
+        var_name = node.var_name_token.value
+        value = context.symbol_table.get(var_name)
+        if not value:
+            raise RTError(node.pos_beg, node.pos_end, f"'{var_name}' is not defined", context)
+        if isinstance(value, (Number, String)):
+            return value.value
+        return value.copy().set_pos(node.pos_beg, node.pos_end).set_context(context)
+
+    def evaluate_VarAssignNode(self, node, context):
+        value = self.evaluate(node.value_node, context)
+        context.symbol_table.set(node.var_name_token.value, box(value, node.value_node, context))
+        return value
+
+    def evaluate_BinOpNode(self, node, context):
+        token = node.operator_token
+        left = self.evaluate(node.left_node, context)
+        if token.type == TOK_KEYWORD and type(left) in NUMBER_TYPES and bool(left) != (token.value == 'AND'):
+            return int(left)
+        right = self.evaluate(node.right_node, context)
+
+        if type(left) in NUMBER_TYPES and type(right) in NUMBER_TYPES and token.type != TOK_DOT:
+            if token.type == TOK_DIV and right == 0:
+                divisor = value_node(node.right_node)
+                raise RTError(divisor.pos_beg, divisor.pos_end, 'Division by zero', context)
+            return NUMBER_OPERATIONS[token.value if token.type == TOK_KEYWORD else token.type](left, right)
+        if token.type == TOK_PLUS and type(left) is str and type(right) is str:
+            return left + right
+
+        left = box(left, node.left_node, context)
+        right = box(right, node.right_node, context)
+        result, error = getattr(left, operator_method_name(token))(right)
+        if error:
+            raise error
+        return unbox(result.set_pos(node.pos_beg, node.pos_end))
+
+    def evaluate_UnaryOpNode(self, node, context):
+        number = self.evaluate(node.node, context)
+        if type(number) in NUMBER_TYPES:
+            if node.operator_token.type == TOK_MINUS:
+                return number * -1
+            if node.operator_token.is_match(TOK_KEYWORD, 'NOT'):
+                return 1 if number == 0 else 0
+            return number
+
+        number = box(number, node.node, context)
+        error = None
+        if node.operator_token.type == TOK_MINUS:
+            number, error = number.multiply(Number(-1))
+        elif node.operator_token.is_match(TOK_KEYWORD, 'NOT'):
+            number, error = number.logical_not()
+        if error:
+            raise error
+        return unbox(number.set_pos(node.pos_beg, node.pos_end))
+
+    def evaluate_IfNode(self, node, context):
+        for condition, expr, null_check in node.cases:
+            if is_true(self.evaluate(condition, context)):
+                expr_value = self.evaluate(expr, context)
+                node.taken = None if null_check else expr
+                return 0 if null_check else expr_value
+
+        if node.else_case:
+            expr, null_check = node.else_case
+            expr_value = self.evaluate(expr, context)
+            node.taken = None if null_check else expr
+            return 0 if null_check else expr_value
+
+        node.taken = None
+        return 0
+
+    def evaluate_WhileNode(self, node, context):
+        elements = [] if node.value_used and not node.null_check else None
+        node.generation += 1
+
+        while is_true(self.evaluate(node.condition_node, context)):
+            value = self.evaluate(node.body_node, context)
+            if elements is not None:
+                elements.append(box(value, node.body_node, context))
+
+        return 0 if elements is None else List(elements).set_context(context).set_pos(node.pos_beg, node.pos_end)
+
+    def evaluate_ForNode(self, node, context):
+        elements = [] if node.value_used and not node.null_check else None
+        node.generation += 1
+
+        start_value = self.evaluate(node.start_value_node, context)
+        end_value = self.evaluate(node.end_value_node, context)
+        step_value = self.evaluate(node.step_value_node, context) if node.step_value_node else 1
+
+        var_name = node.var_name_token.value
+        symbol_table = context.symbol_table
+        i = start_value.value if isinstance(start_value, Value) else start_value
+        end = end_value.value if isinstance(end_value, Value) else end_value
+        step = step_value.value if isinstance(step_value, Value) else step_value
+        ascending = step >= 0
+
+        while i < end if ascending else i > end:
+            symbol_table.set(var_name, Number(i))
+            i += step
+            value = self.evaluate(node.body_node, context)
+            if elements is not None:
+                elements.append(box(value, node.body_node, context))
+
+        return 0 if elements is None else List(elements).set_context(context).set_pos(node.pos_beg, node.pos_end)
+
+    def evaluate_FuncDefNode(self, node, context):
+        func_name = node.var_name_token.value if node.var_name_token else None
+        arg_names = [arg_name.value for arg_name in node.arg_name_tokens]
+        func_value = UnboxedFunction(func_name, node.body_node, arg_names, node.null_check, self) \
+            .set_context(context).set_pos(node.pos_beg, node.pos_end)
+
+        if node.var_name_token:
+            context.symbol_table.set(func_name, func_value)
+
+        return func_value
+
+    def evaluate_CallNode(self, node, context):
+        value_to_call = box(self.evaluate(node.node_to_call, context), node.node_to_call, context)
+        value_to_call = value_to_call.copy().set_pos(node.pos_beg, node.pos_end)
+        args = [box(self.evaluate(arg_node, context), arg_node, context) for arg_node in node.arg_nodes]
+
+        if isinstance(value_to_call, UnboxedFunction):
+            return_value = value_to_call.call(args)
+            if not isinstance(return_value, Value):
+                return return_value
+        else:
+            res = value_to_call.execute(args)
+            if res.error:
+                raise res.error
+            return_value = res.value
+            if isinstance(return_value, (Number, String)):
+                return return_value.value
+
+        return return_value.copy().set_pos(node.pos_beg, node.pos_end).set_context(context)
+
+    def evaluate_ListNode(self, node, context):
+        if not node.value_used:
+            value = 0
+            for element_node in node.element_nodes:
+                value = self.evaluate(element_node, context)
+            return value
+
+        elements = [box(self.evaluate(element_node, context), element_node, context)
+                    for element_node in node.element_nodes]
+        return List(elements).set_context(context).set_pos(node.pos_beg, node.pos_end)
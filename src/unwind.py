@@ -0,0 +1,242 @@
+from .interpreter import *
+from .bytecode import operator_method_name
+
+
+# ----------- UNWINDING FUNCTION ------------
+
+class UnwindingFunction(Function):
+    __slots__ = ()
+
+    def call(self, args):
+        exec_ctx = self.generate_new_context()
+
+        res = self.check_and_populate_args(self.arg_names, args, exec_ctx)
+        if res.error:
+            raise res.error
+
+        value = self.interpreter.evaluate(self.body_node, exec_ctx)
+        return Number.null if self.null_check else value
+
+    def copy(self):
+        copy = UnwindingFunction(self.name, self.body_node, self.arg_names, self.null_check, self.interpreter)
+        copy.context = self.context
+        copy.body_names = self.body_names
+        copy.set_pos(self.pos_beg, self.pos_end)
+        return copy
+
+
+# --------- UNWINDING INTERPRETER -----------
+
+class UnwindingInterpreter:
+    def execute(self, node, context):
+        try:
+            return RTResult().success(self.evaluate(node, context))
+        except Error as error:
+            return RTResult().failure(error)
+
+    def evaluate(self, node, context):
+        method_name = f'evaluate_{type(node).__name__}'
+        method = getattr(self, method_name, self.no_evaluate_method)
+        return method(node, context)
+
+    def no_evaluate_method(self, node, context):
+        raise Exception(f'No evaluate_{type(node).__name__} method defined')
+
+    @staticmethod
+    def evaluate_NumberNode(node, context):
+        return Number(node.tok.value).set_context(context).set_pos(node.pos_beg, node.pos_end)
+
+    @staticmethod
+    def evaluate_StringNode(node, context):
+        return String(node.tok.value).set_context(context).set_pos(node.pos_beg, node.pos_end)
+
+    @staticmethod
+    def evaluate_ConstNode(node, context):
+        return node.value.set_context(context)
+
+    def evaluate_InvariantNode(self, node, context):
+        value = node.cached(context)
+        if value is None:
+            value = self.evaluate(node.node, context)
+            if isinstance(value, (Number, String)):
+                node.remember(context, value)
+        return value
+
+    @staticmethod
+    def evaluate_VarAccessNode(node, context):
+        var_name = node.var_name_token.value
+        value = context.symbol_table.get(var_name)
+        if not value:
+            raise RTError(node.pos_beg, node.pos_end, f"'{var_name}' is not defined", context)
+        return value.copy().set_pos(node.pos_beg, node.pos_end).set_context(context)
+
+    def evaluate_VarAssignNode(self, node, context):
+        value = self.evaluate(node.value_node, context)
+        context.symbol_table.set(node.var_name_token.value, value)
+        return value
+
+    def evaluate_BinOpNode(self, node, context):
+        if node.numeric:
+            return self.evaluate_numeric(node, context)
+
+        left = self.evaluate(node.left_node, context)
+        if node.operator_token.type == TOK_KEYWORD:
+            result = short_circuit(node, left)
+            if result is not None:
+                return result
+        right = self.evaluate(node.right_node, context)
+
+        result, error = getattr(left, operator_method_name(node.operator_token))(right)
+        if error:
+            raise error
+        return result.set_pos(node.pos_beg, node.pos_end)
+
+    def evaluate_UnaryOpNode(self, node, context):
+        if node.numeric:
+            return self.evaluate_numeric(node, context)
+
+        number = self.evaluate(node.node, context)
+        error = None
+        if node.operator_token.type == TOK_MINUS:
+            number, error = number.multiply(Number(-1))
+        elif node.operator_token.is_match(TOK_KEYWORD, 'NOT'):
+            number, error = number.logical_not()
+        if error:
+            raise error
+        return number.set_pos(node.pos_beg, node.pos_end)
+
+    def evaluate_numeric(self, node, context):
+        value = self.numeric_value(node, context)
+        if isinstance(value, Value):
+            return value
+        return Number(value).set_context(context).set_pos(node.pos_beg, node.pos_end)
+
+    def numeric_value(self, node, context):
+        if isinstance(node, NumberNode):
+            return node.tok.value
+        if isinstance(node, ConstNode):
+            return node.value.value
+        if isinstance(node, VarAccessNode):
+            value = context.symbol_table.get(node.var_name_token.value)
+            if type(value) is Number:
+                return value.value
+
+        if isinstance(node, BinOpNode) and node.numeric:
+            left = self.numeric_value(node.left_node, context)
+            token = node.operator_token
+            if isinstance(left, Value):
+                if token.type == TOK_KEYWORD:
+                    result = short_circuit(node, left)
+                    if result is not None:
+                        return numeric_result(result)
+            elif token.type == TOK_KEYWORD and bool(left) != (token.value == 'AND'):
+                return int(left)
+
+            right = self.numeric_value(node.right_node, context)
+            if isinstance(left, Value) or isinstance(right, Value):
+                left = boxed(left, node.left_node, context)
+                result, error = getattr(left, operator_method_name(token))(boxed(right, node.right_node, context))
+                if error:
+                    raise error
+                return numeric_result(result.set_pos(node.pos_beg, node.pos_end))
+            if token.type == TOK_DIV and right == 0:
+                raise RTError(node.right_node.pos_beg, node.right_node.pos_end, 'Division by zero', context)
+            return NUMBER_OPERATIONS[token.value if token.type == TOK_KEYWORD else token.type](left, right)
+
+        if isinstance(node, UnaryOpNode) and node.numeric:
+            operand = self.numeric_value(node.node, context)
+            if isinstance(operand, Value):
+                if node.operator_token.type == TOK_MINUS:
+                    result, error = operand.multiply(Number(-1))
+                else:
+                    result, error = operand.logical_not()
+                if error:
+                    raise error
+                return numeric_result(result.set_pos(node.pos_beg, node.pos_end))
+            if node.operator_token.type == TOK_MINUS:
+                return operand * -1
+            return 1 if operand == 0 else 0
+
+        return numeric_result(self.evaluate(node, context))
+
+    def evaluate_IfNode(self, node, context):
+        for condition, expr, null_check in node.cases:
+            if self.evaluate(condition, context).is_true():
+                expr_value = self.evaluate(expr, context)
+                return Number.null if null_check else expr_value
+
+        if node.else_case:
+            expr, null_check = node.else_case
+            expr_value = self.evaluate(expr, context)
+            return Number.null if null_check else expr_value
+
+        return Number.null
+
+    def evaluate_WhileNode(self, node, context):
+        elements = [] if node.value_used and not node.null_check else None
+        node.generation += 1
+
+        while self.evaluate(node.condition_node, context).is_true():
+            value = self.evaluate(node.body_node, context)
+            if elements is not None:
+                elements.append(value)
+
+        return Number.null if elements is None else List(elements).set_context(context).set_pos(node.pos_beg, node.pos_end)
+
+    def evaluate_ForNode(self, node, context):
+        elements = [] if node.value_used and not node.null_check else None
+        node.generation += 1
+
+        start_value = self.evaluate(node.start_value_node, context)
+        end_value = self.evaluate(node.end_value_node, context)
+        step_value = self.evaluate(node.step_value_node, context) if node.step_value_node else Number(1)
+
+        var_name = node.var_name_token.value
+        symbol_table = context.symbol_table
+        i = start_value.value
+        step = step_value.value
+        ascending = step >= 0
+
+        while i < end_value.value if ascending else i > end_value.value:
+            symbol_table.set(var_name, Number(i))
+            i += step
+            value = self.evaluate(node.body_node, context)
+            if elements is not None:
+                elements.append(value)
+
+        return Number.null if elements is None else List(elements).set_context(context).set_pos(node.pos_beg, node.pos_end)
+
+    def evaluate_FuncDefNode(self, node, context):
+        func_name = node.var_name_token.value if node.var_name_token else None
+        arg_names = [arg_name.value for arg_name in node.arg_name_tokens]
+        func_value = UnwindingFunction(func_name, node.body_node, arg_names, node.null_check, self) \
+            .set_context(context).set_pos(node.pos_beg, node.pos_end)
+
+        if node.var_name_token:
+            context.symbol_table.set(func_name, func_value)
+
+        return func_value
+
+    def evaluate_CallNode(self, node, context):
+        value_to_call = self.evaluate(node.node_to_call, context).copy().set_pos(node.pos_beg, node.pos_end)
+        args = [self.evaluate(arg_node, context) for arg_node in node.arg_nodes]
+
+        if isinstance(value_to_call, UnwindingFunction):
+            return_value = value_to_call.call(args)
+        else:
+            res = value_to_call.execute(args)
+            if res.error:
+                raise res.error
+            return_value = res.value
+
+        return return_value.copy().set_pos(node.pos_beg, node.pos_end).set_context(context)
+
+    def evaluate_ListNode(self, node, context):
+        if not node.value_used:
+            value = Number.null
+            for element_node in node.element_nodes:
+                value = self.evaluate(element_node, context)
+            return value
+
+        elements = [self.evaluate(element_node, context) for element_node in node.element_nodes]
+        return List(elements).set_context(context).set_pos(node.pos_beg, node.pos_end)
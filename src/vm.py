@@ -0,0 +1,178 @@
+from .interpreter import *
+from .bytecode import *
+
+
+# ------------ COMPILED FUNCTION ------------
+
+class CompiledFunction(Function):
+    __slots__ = ('code',)
+
+    def __init__(self, name, body_node, arg_names, null_check, code):
+        super().__init__(name, body_node, arg_names, null_check)
+        self.code = code
+
+    def execute(self, args):
+        res = RTResult()
+        exec_ctx = self.generate_new_context()
+
+        res.register(self.check_and_populate_args(self.arg_names, args, exec_ctx))
+        if res.error:
+            return res
+
+        value = res.register(VM().run(self.code, exec_ctx))
+        if res.error:
+            return res
+        return res.success(Number.null if self.null_check else value)
+
+    def copy(self):
+        copy = CompiledFunction(self.name, self.body_node, self.arg_names, self.null_check, self.code)
+        copy.context = self.context
+        copy.body_names = self.body_names
+        copy.set_pos(self.pos_beg, self.pos_end)
+        return copy
+
+
+# ------------------- VM --------------------
+
+class VM:
+    def run(self, code, context):
+        res = RTResult()
+        instructions = code.instructions
+        consts = code.consts
+        symbol_table = context.symbol_table
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+        end = len(instructions)
+
+        while pc < end:
+            op, arg, node = instructions[pc]
+            pc += 1
+
+            if op == OP_LOAD_NAME:
+                value = symbol_table.get(arg)
+                if not value:
+                    return res.failure(RTError(node.pos_beg, node.pos_end, f"'{arg}' is not defined", context))
+                push(value.copy().set_pos(node.pos_beg, node.pos_end).set_context(context))
+
+            elif op == OP_LOAD_CONST:
+                value = consts[arg]
+                value = String(value) if isinstance(value, str) else Number(value)
+                push(value.set_context(context).set_pos(node.pos_beg, node.pos_end))
+
+            elif op == OP_LOAD_VALUE:
+                push(arg.set_context(context))
+
+            elif op == OP_BINARY_OP:
+                right = pop()
+                left = pop()
+                result, error = getattr(left, arg)(right)
+                if error:
+                    return res.failure(error)
+                push(result.set_pos(node.pos_beg, node.pos_end))
+
+            elif op == OP_POP_JUMP_IF_FALSE:
+                if not pop().is_true():
+                    pc = arg
+
+            elif op == OP_JUMP:
+                pc = arg
+
+            elif op == OP_FOR_ITER:
+                state = stack[-1]
+                if not (state[0] < state[1] if state[3] else state[0] > state[1]):
+                    pc = arg[0]
+                    continue
+                symbol_table.set(arg[1], Number(state[0]))
+                state[0] += state[2]
+
+            elif op == OP_ACC_APPEND:
+                value = pop()
+                elements = stack[-arg]
+                if elements is not None:
+                    elements.append(value)
+
+            elif op == OP_STORE_NAME:
+                symbol_table.set(arg, stack[-1])
+
+            elif op == OP_CALL:
+                args = stack[len(stack) - arg:] if arg else []
+                del stack[len(stack) - arg:]
+                value_to_call = pop().copy().set_pos(node.pos_beg, node.pos_end)
+
+                return_value = res.register(value_to_call.execute(args))
+                if res.error:
+                    return res
+                push(return_value.copy().set_pos(node.pos_beg, node.pos_end).set_context(context))
+
+            elif op == OP_POP_TOP:
+                pop()
+
+            elif op == OP_LOAD_NULL:
+                push(Number.null)
+
+            elif op == OP_UNARY_OP:
+                number = pop()
+                error = None
+                if arg == 'negate':
+                    number, error = number.multiply(Number(-1))
+                elif arg == 'logical_not':
+                    number, error = number.logical_not()
+                if error:
+                    return res.failure(error)
+                push(number.set_pos(node.pos_beg, node.pos_end))
+
+            elif op == OP_BUILD_LIST:
+                elements = stack[len(stack) - arg:] if arg else []
+                del stack[len(stack) - arg:]
+                push(List(elements).set_context(context).set_pos(node.pos_beg, node.pos_end))
+
+            elif op == OP_MAKE_FUNCTION:
+                func_name = node.var_name_token.value if node.var_name_token else None
+                arg_names = [arg_name.value for arg_name in node.arg_name_tokens]
+                func_value = CompiledFunction(func_name, node.body_node, arg_names, node.null_check, arg) \
+                    .set_context(context).set_pos(node.pos_beg, node.pos_end)
+                if node.var_name_token:
+                    symbol_table.set(func_name, func_value)
+                push(func_value)
+
+            elif op == OP_NEW_ACC:
+                node.generation += 1
+                push(None if arg else [])
+
+            elif op == OP_END_ACC:
+                elements = pop()
+                if arg:
+                    push(Number.null)
+                else:
+                    push(List(elements).set_context(context).set_pos(node.pos_beg, node.pos_end))
+
+            elif op == OP_FOR_PREP:
+                step_value = pop() if arg else Number(1)
+                if not arg:
+                    pop()
+                end_value = pop()
+                start_value = pop()
+                push([start_value.value, end_value.value, step_value.value, step_value.value >= 0])
+
+            elif op == OP_END_FOR:
+                pop()
+
+            elif op == OP_SHORT_CIRCUIT:
+                result = short_circuit(node, stack[-1])
+                if result is not None:
+                    stack[-1] = result
+                    pc = arg
+
+            elif op == OP_LOAD_INVARIANT:
+                value = node.cached(context)
+                if value is not None:
+                    push(value)
+                    pc = arg
+
+            elif op == OP_STORE_INVARIANT:
+                if isinstance(stack[-1], (Number, String)):
+                    node.remember(context, stack[-1])
+
+        return res.success(stack[-1])